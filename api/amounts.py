@@ -0,0 +1,87 @@
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast
+from sqlmodel import Session, func, select, update
+
+from .models.app import AppConfig
+from .models.transactions import Transaction
+from .models.recurring_transactions import RecurringTransaction
+
+# Amounts are stored as integers in minor units (e.g. cents): AMOUNT_EXPONENT (AppConfig) is the number of
+# decimals they are scaled by, so sums are exact and no Decimal or float is built per row
+
+# Largest amount in minor units, leaving room to sum millions of them in SQLite's 64-bit integers
+MAX_MINOR_UNITS = 10 ** 15
+
+def to_minor_units(amount: Decimal, exponent: int) -> int:
+    """The amount in minor units, refusing amounts with more decimals than `exponent` (raises ValueError)."""
+    minor_units = amount.scaleb(exponent)
+    if abs(minor_units) > MAX_MINOR_UNITS:
+        raise ValueError("amount is too large")
+    if minor_units != minor_units.to_integral_value():
+        raise ValueError(f"amount must have at most {exponent} decimals" if exponent else "amount must be a whole number")
+    return int(minor_units)
+
+def format_amount(minor_units: int, exponent: int) -> str:
+    """An amount in minor units as a decimal string with exactly `exponent` decimals (e.g. 1050 -> "10.50")."""
+    if minor_units < 0:
+        return "-" + format_amount(-minor_units, exponent)
+    if not exponent:
+        return str(minor_units)
+    digits = f"{minor_units:0{exponent + 1}d}"
+    return f"{digits[:-exponent]}.{digits[-exponent:]}"
+
+def read_amount_exponent(db: Session) -> int:
+    """AMOUNT_EXPONENT as stored, bypassing the settings cache."""
+    return int(db.exec(select(AppConfig.value).where(AppConfig.key == "AMOUNT_EXPONENT")).one())
+
+def parse_amount(amount: Decimal, exponent: int) -> int:
+    """An amount received by the API in minor units of `exponent` decimals, to be saved with commit_amounts."""
+    try:
+        return to_minor_units(amount, exponent)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def commit_amounts(db: Session, exponent: int):
+    """Commit amounts parsed with `exponent` decimals, unless a currency change rescaled the stored amounts meanwhile (409)."""
+    # Once flushed the session holds the write lock, so the scale can't change between this check and the commit
+    db.flush()
+    if read_amount_exponent(db) != exponent:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="The currency decimals changed while saving, please try again.")
+    db.commit()
+
+def rescale_amounts(db: Session, exponent: int) -> int:
+    """Store every amount with `exponent` decimals, in the caller's transaction (the summary triggers rescale the monthly totals).
+
+    Amounts with more decimals are rounded (half away from zero). Returns how many were rounded.
+    """
+    current = read_amount_exponent(db)
+    if exponent == current:
+        return 0
+
+    # Update the scale first, taking the write lock, so no amount parsed at the old scale is committed after the rescale
+    claimed = db.exec(
+        update(AppConfig)
+        .where(AppConfig.key == "AMOUNT_EXPONENT")
+        .where(AppConfig.value == str(current))
+        .values(value=str(exponent))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        raise HTTPException(status_code=409, detail="The currency decimals changed meanwhile, please try again.")
+
+    models = (Transaction, RecurringTransaction)
+    rounded = 0
+    if exponent > current:
+        factor = 10 ** (exponent - current)
+        scale = lambda amount: amount * factor
+    else:
+        factor = 10 ** (current - exponent)
+        for model in models:
+            rounded += db.exec(select(func.count()).select_from(model).where(model.amount % factor != 0)).one()
+        scale = lambda amount: cast(func.round(amount / factor), Integer)
+
+    for model in models:
+        db.exec(update(model).values(amount=scale(model.amount)).execution_options(synchronize_session=False))
+    return rounded
@@ -0,0 +1,99 @@
+import os
+import threading
+from email.utils import formatdate
+from pathlib import Path
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .models.api_keys import ApiKeys
+from .models.app import AppConfig
+
+class VersionFile:
+    """A file replaced on every change, so each worker can tell with a single stat() whether its view is current."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def version(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+            return (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def bump(self):
+        # Replace the file (new inode) so the change is detected even on coarse mtime filesystems
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(os.urandom(8).hex())
+        os.replace(tmp, self.path)
+
+# Bumped after every commit that changed data (AppConfig included), whichever router, task or worker made it,
+# and after the migrations and rebuilds that write through a plain connection
+DATA_VERSION = VersionFile("data/data.version")
+
+# Bumped on every AppConfig write (see settings.py)
+CONFIG_VERSION = VersionFile("data/config.version")
+
+def is_cached_data(obj) -> bool:
+    # API key usage and login tokens are bookkeeping that no cached response reads
+    return not isinstance(obj, ApiKeys) and not (isinstance(obj, AppConfig) and obj.key == "LOGIN_TOKEN")
+
+@event.listens_for(Session, "after_flush")
+def track_flushed_changes(session, flush_context):
+    changed = [*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj))]
+    if any(is_cached_data(obj) for obj in changed):
+        session.info["data_changed"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def track_bulk_changes(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements don't go through the flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is ApiKeys:
+        return
+    result = orm_execute_state.invoke_statement()
+    if orm_execute_state.is_insert or result.rowcount:
+        orm_execute_state.session.info["data_changed"] = True
+    return result
+
+# After the commit, so a request that sees the new version also sees the new data
+@event.listens_for(Session, "after_commit")
+def bump_data_version(session):
+    if session.info.pop("data_changed", False):
+        DATA_VERSION.bump()
+
+@event.listens_for(Session, "after_rollback")
+def discard_data_changes(session):
+    session.info.pop("data_changed", None)
+
+def check_not_modified(request: Request, response: Response):
+    """Dependency for cacheable GET endpoints.
+
+    Answers 304 before the endpoint runs when If-None-Match carries the current ETag,
+    otherwise adds ETag/Last-Modified to the response. The version is read before the
+    endpoint queries the database, so a concurrent write can only make the ETag stale, never the data.
+    """
+    version = DATA_VERSION.version()
+    if version is None:
+        return
+
+    inode, mtime_ns = version
+    etag = f'W/"{inode:x}-{mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(mtime_ns / 1e9, usegmt=True),
+        # Let browsers keep the response but revalidate it on every use
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison, as proxies that compress the response weaken the ETag
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
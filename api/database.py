@@ -1,11 +1,47 @@
-from sqlmodel import Session, SQLModel, create_engine
+import os
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# SQLite tuning, applied to every new connection (can be overridden with environment variables)
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # Negative values are KiB (64 MiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+}
 
 # Create the engine to connect to the SQLite database
-engine = create_engine("sqlite:///data/wally.db", connect_args={"check_same_thread": False})
+# The pool is sized for the request threadpool, so requests don't queue for a connection
+engine = create_engine(
+    "sqlite:///data/wally.db",
+    connect_args={"check_same_thread": False},
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+)
+
+# Async engine (aiosqlite) for read-heavy endpoints, so they run on the event loop instead of the threadpool
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///data/wally.db",
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+)
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
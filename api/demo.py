@@ -1,12 +1,20 @@
 from pathlib import Path
-from sqlmodel import SQLModel, Session, create_engine
-from datetime import date
-from decimal import Decimal
+from collections import Counter
+from sqlmodel import Session, insert
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from uuid import UUID
+import argparse
+import json
 import random
 import calendar
 import secrets
+import time
 
-from .models.transactions import Transaction
+from .database import engine
+from .migrations import run_migrations, create_triggers, rebuild_derived_tables, TRANSACTION_TRIGGERS
+from .models.recurring_transactions import RecurringTransaction
+from .routers.recurring_transactions import extend_recurring_transactions
 from .models.categories import Category
 from .models.tags import Tag
 from .models.currency import Currency
@@ -39,8 +47,8 @@ DEFAULT_CURRENCIES = [
     {"name": "IDR", "symbol": "Rp", "position": "left", "selected": False},
     {"name": "ILS", "symbol": "₪", "position": "left", "selected": False},
     {"name": "INR", "symbol": "₹", "position": "left", "selected": False},
-    {"name": "JPY", "symbol": "¥", "position": "left", "selected": False},
-    {"name": "KRW", "symbol": "₩", "position": "left", "selected": False},
+    {"name": "JPY", "symbol": "¥", "position": "left", "selected": False, "exponent": 0},
+    {"name": "KRW", "symbol": "₩", "position": "left", "selected": False, "exponent": 0},
     {"name": "MXN", "symbol": "Mex$", "position": "left", "selected": False},
     {"name": "MYR", "symbol": "RM", "position": "left", "selected": False},
     {"name": "NZD", "symbol": "NZ$", "position": "left", "selected": False},
@@ -52,7 +60,7 @@ DEFAULT_CURRENCIES = [
     {"name": "THB", "symbol": "฿", "position": "left", "selected": False},
     {"name": "TRY", "symbol": "₺", "position": "left", "selected": False},
     {"name": "USD", "symbol": "$", "position": "left", "selected": False},
-    {"name": "VND", "symbol": "₫", "position": "right", "selected": False},
+    {"name": "VND", "symbol": "₫", "position": "right", "selected": False, "exponent": 0},
     {"name": "ZAR", "symbol": "R", "position": "left", "selected": False},
 ]
 
@@ -76,65 +84,107 @@ CATEGORY_TAGS = {
     "Income": ["salary", "bonus"]
 }
 
+CATEGORY_WEIGHTS = [0.08, 0.2, 0.25, 0.05, 0.08, 0.04, 0.1, 0.1, 0.05, 0.05]
+
+# Transactions per month in the default demo (the monthly totals below are sized for it)
+MONTHLY_TRANSACTIONS = 75
+
+# Rows per INSERT batch
+BATCH_SIZE = 10000
+
+INSERT_TRANSACTION = """
+    INSERT INTO "transaction" (id, name, category, tags, amount, type, date, "recurringID", created_date)
+    VALUES (:id, :name, :category, :tags, :amount, :type, :date, :recurringID, :created_date)
+"""
+
 # ------------------------
 # Utils
 # ------------------------
-def random_date_for_month(year: int, month: int):
-    last_day = calendar.monthrange(year, month)[1]
-    return date(year, month, random.randint(1, last_day))
+def random_uuid():
+    # Faster than uuid4() (no os.urandom call), which matters for millions of rows
+    return UUID(int=random.getrandbits(128), version=4)
 
-def generate_month_transactions(year: int, month: int, n: int):
-    """Generate ~n transactions with realistic amounts and mostly positive balances."""
+def generate_month_transactions(year: int, month: int, n: int, tag_pool: list[str]):
+    """Generate n transaction rows (as stored in the database) with realistic amounts and mostly positive balances."""
+    last_day = calendar.monthrange(year, month)[1]
+    categories = random.choices(DEFAULT_CATEGORIES, weights=CATEGORY_WEIGHTS, k=n)
+    days = random.choices(range(1, last_day + 1), k=n)
+    names = random.choices(range(1, 501), k=n)
+    tag_counts = random.choices(range(3), k=n)
 
-    txs = []
-    for _ in range(n):
-        category = random.choices(
-            DEFAULT_CATEGORIES,
-            weights=[0.08, 0.2, 0.25, 0.05, 0.08, 0.04, 0.1, 0.1, 0.05, 0.05]
-        )[0]
+    rows = []
+    for category, day, name, tag_count in zip(categories, days, names, tag_counts):
         t_type = "income" if category == "Income" else "expense"
         # smaller amounts for more realistic transactions
         amount = random.uniform(5, 100) if t_type == "expense" else random.uniform(500, 1500)
-        possible_tags = CATEGORY_TAGS.get(category, []) + ["online", "special", "urgent"]
-        tags = random.sample(possible_tags, k=random.randint(0, min(2, len(possible_tags))))
-        tx_date = random_date_for_month(year, month)
-
-        txs.append(Transaction(
-            name=f"{category} {random.randint(1, 500)}",
-            category=category,
-            type=t_type,
-            amount=Decimal(str(round(amount, 2))),
-            tags=tags,
-            date=tx_date
-        ))
-
-    # Normalize totals
-    expenses = [t for t in txs if t.type == "expense"]
-    incomes = [t for t in txs if t.type == "income"]
-
-    # Set monthly targets so income is usually >= expenses
-    expense_target = random.uniform(2000, 4000)
+        possible_tags = CATEGORY_TAGS.get(category, []) + random.choices(tag_pool, k=2)
+        tags = list(dict.fromkeys(random.choices(possible_tags, k=tag_count)))
+        created_date = datetime(year, month, day) + timedelta(seconds=random.uniform(0, 86400))
+        rows.append({
+            "id": random_uuid().hex,
+            "name": f"{category} {name}",
+            "category": category,
+            "tags": json.dumps(tags),
+            "amount": amount,
+            "type": t_type,
+            "date": date(year, month, day).isoformat(),
+            "recurringID": "",
+            "created_date": created_date.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        })
+
+    # Set monthly targets so income is usually >= expenses (scaled to the number of transactions)
+    expense_target = random.uniform(2000, 4000) * n / MONTHLY_TRANSACTIONS
     income_target = expense_target * random.uniform(1.0, 1.5)  # income ≥ expenses most months
 
     def normalize(group, target_sum):
-        if not group: 
+        if not group:
             return
-        current_sum = sum(float(t.amount) for t in group)
+        current_sum = sum(row["amount"] for row in group)
         scale = target_sum / current_sum if current_sum > 0 else 1
-        for t in group:
-            t.amount = Decimal(str(round(float(t.amount) * scale, 2)))
+        for row in group:
+            # Stored in cents
+            row["amount"] = max(round(row["amount"] * scale * 100), 1)
 
-    normalize(expenses, expense_target)
-    normalize(incomes, income_target)
+    normalize([row for row in rows if row["type"] == "expense"], expense_target)
+    normalize([row for row in rows if row["type"] == "income"], income_target)
 
-    return txs
+    return rows
+
+def generate_recurring_transactions(n: int, first_day: date, last_day: date, tag_pool: list[str]):
+    """Generate n recurring transaction rows (their occurrences are created by the recurring extender)."""
+    rows = []
+    for _ in range(n):
+        category = random.choices(DEFAULT_CATEGORIES, weights=CATEGORY_WEIGHTS)[0]
+        t_type = "income" if category == "Income" else "expense"
+        start = first_day + timedelta(days=random.randint(0, (last_day - first_day).days))
+        rows.append({
+            "id": random_uuid(),
+            "name": f"{category} subscription {random.randint(1, 500)}",
+            "category": category,
+            "type": t_type,
+            "amount": round((random.uniform(5, 100) if t_type == "expense" else random.uniform(500, 1500)) * 100),  # In cents
+            "tags": random.sample(tag_pool, k=random.randint(0, min(2, len(tag_pool)))),
+            "startDate": start,
+            "endDate": max(start, last_day),
+            "frequency": random.choices(["daily", "weekly", "monthly", "yearly"], weights=[0.05, 0.15, 0.7, 0.1])[0],
+            "created_date": datetime.now(),
+        })
+    return rows
 
 # ------------------------
 # Main
 # ------------------------
-def generate_demo():
+# Created once the demo database is ready, so later workers and restarts reuse it
+DEMO_MARKER = Path("data/demo")
+
+def generate_demo(transactions: int | None = None, recurring: int = 0, tags: int = len(DEFAULT_TAGS), years: int = 5):
+    """Create data/wally.db filled with random data: `transactions` spread over `years` centered on this year (default: ~75 a month)."""
     db_path = Path("data/wally.db")
 
+    # Already generated (by another worker, or before a restart)
+    if db_path.exists() and DEMO_MARKER.exists():
+        return
+
     # Safety check: refuse to run demo mode if a real database already exists
     if db_path.exists():
         print("\n" + "=" * 60)
@@ -146,27 +196,66 @@ def generate_demo():
         raise SystemExit(1)
 
     db_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
 
-    engine = create_engine(f"sqlite:///{db_path}")
-    SQLModel.metadata.create_all(engine)
+    run_migrations()
+
+    tag_pool = (DEFAULT_TAGS + [f"tag-{i}" for i in range(len(DEFAULT_TAGS), tags)])[:tags]
+    first_year = date.today().year - (years - 1) // 2
+    months = [(first_year + i // 12, i % 12 + 1) for i in range(years * 12)]
+    if transactions is None:
+        per_month = {i: random.randint(50, 100) for i in range(len(months))}
+    else:
+        per_month = Counter(random.choices(range(len(months)), k=transactions))
 
     with Session(engine) as session:
         session.add_all([Category(name=c) for c in DEFAULT_CATEGORIES])
-        session.add_all([Tag(name=t) for t in DEFAULT_TAGS])
+        session.add_all([Tag(name=t) for t in tag_pool])
         session.add_all([Currency(**c) for c in DEFAULT_CURRENCIES])
         session.add_all([AppConfig(**c) for c in DEFAULT_CONFIG])
         session.commit()
 
-        current_year = date.today().year
-        years = [current_year - 2, current_year - 1, current_year, current_year + 1, current_year + 2]
+    # Bulk insert without the per-row triggers, then build the derived tables in one pass
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        for name in TRANSACTION_TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+
+        # Rows are generated in their stored form and inserted through the driver, skipping SQLAlchemy's per-row processing
+        batch = []
+        for i, (year, month) in enumerate(months):
+            batch += generate_month_transactions(year, month, per_month[i], tag_pool)
+            if len(batch) >= BATCH_SIZE:
+                conn.exec_driver_sql(INSERT_TRANSACTION, batch)
+                batch = []
+        if batch:
+            conn.exec_driver_sql(INSERT_TRANSACTION, batch)
 
-        for year in years:
-            for month in range(1, 12 + 1):
-                txs = generate_month_transactions(year, month, n=random.randint(50, 100))
-                session.add_all(txs)
-                session.commit()
+        if recurring:
+            last_day = date(first_year + years, 1, 1) - relativedelta(days=1)
+            conn.execute(insert(RecurringTransaction), generate_recurring_transactions(recurring, date(first_year, 1, 1), last_day, tag_pool))
 
-    print(f"✅ Database 'wally.db' created in {db_path.resolve()}.")
+        create_triggers(conn, TRANSACTION_TRIGGERS)
+        conn.commit()
+
+    rebuild_derived_tables()
+
+    # Occurrences of the recurring transactions (inserted through the triggers)
+    if recurring:
+        extend_recurring_transactions()
+
+    DEMO_MARKER.touch()
+    print(f"✅ Database 'wally.db' created in {db_path.resolve()} ({time.perf_counter() - started:.1f}s).")
 
 if __name__ == "__main__":
-    generate_demo()
+    parser = argparse.ArgumentParser(description="Create data/wally.db filled with random data.")
+    parser.add_argument("--transactions", type=int, help="Number of transactions (default: 50-100 a month)")
+    parser.add_argument("--recurring", type=int, default=0, help="Number of recurring transactions (default: 0)")
+    parser.add_argument("--tags", type=int, default=len(DEFAULT_TAGS), help=f"Number of tags (default: {len(DEFAULT_TAGS)})")
+    parser.add_argument("--years", type=int, default=5, help="Years of data, centered on the current year (default: 5)")
+    parser.add_argument("--seed", type=int, help="Random seed, for reproducible datasets")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    generate_demo(args.transactions, args.recurring, args.tags, args.years)
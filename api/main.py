@@ -1,49 +1,81 @@
 import os
-from contextlib import asynccontextmanager
+import fcntl
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import Session, select
 
-from .database import create_db_and_tables, engine
+from .database import engine
 from .demo import generate_demo
-from .routers import transactions, recurring_transactions, categories, tags, currency, auth, api_keys
+from .metrics import MetricsMiddleware, save_snapshots_periodically
+from .migrations import run_migrations
+from .profiling import ProfilerMiddleware
+from .routers import transactions, recurring_transactions, analytics, categories, tags, currency, auth, api_keys, metrics
 from .models.app import AppConfig, DEFAULT_CONFIG
 from .models.categories import Category, DEFAULT_CATEGORIES
 from .models.currency import Currency, DEFAULT_CURRENCIES
+from .routers.recurring_transactions import extend_recurring_transactions, RECURRING_EXTEND_INTERVAL
+from .settings import invalidate_settings
 
 VERSION = "1.15"
 
+STARTUP_LOCK = Path("data/startup.lock")
+
+async def extend_recurring_periodically():
+    # Keep recurring transactions materialized up to the rolling horizon
+    while True:
+        await run_in_threadpool(extend_recurring_transactions)
+        await asyncio.sleep(RECURRING_EXTEND_INTERVAL)
+
+@contextmanager
+def startup_lock():
+    # Held while a worker runs the startup work, so workers started together run it one at a time
+    STARTUP_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    with open(STARTUP_LOCK, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Demo version
-    if os.getenv("DEMO", "false").lower() == "true":
-        generate_demo()
-
-    # Live version
-    else:
-        create_db_and_tables()
-
-    # Init database session
-    with Session(engine) as db:
-        # Create default settings
-        for key, value in DEFAULT_CONFIG.items():
-            if not db.get(AppConfig, key):
-                db.add(AppConfig(key=key, value=value))
-        db.commit()
-
-        # Create default categories if table is empty
-        if not db.exec(select(Category).limit(1)).first():
-            db.bulk_insert_mappings(Category, DEFAULT_CATEGORIES)
+    with startup_lock():
+        # Demo version
+        if os.getenv("DEMO", "false").lower() == "true":
+            generate_demo()
+
+        # Create or upgrade the database schema
+        run_migrations()
+
+        # Init database session
+        with Session(engine) as db:
+            # Create default settings
+            for key, value in DEFAULT_CONFIG.items():
+                if not db.get(AppConfig, key):
+                    db.add(AppConfig(key=key, value=value))
             db.commit()
+            invalidate_settings()
 
-        # Create default currencies
-        for item in DEFAULT_CURRENCIES:
-            if not db.get(Currency, item['name']):
-                db.add(Currency(**item))
-        db.commit()
+            # Create default categories if table is empty
+            if not db.exec(select(Category).limit(1)).first():
+                db.bulk_insert_mappings(Category, DEFAULT_CATEGORIES)
+                db.commit()
+
+            # Create default currencies
+            for item in DEFAULT_CURRENCIES:
+                if not db.get(Currency, item['name']):
+                    db.add(Currency(**item))
+            db.commit()
+
+    extender = asyncio.create_task(extend_recurring_periodically())
+    metrics_saver = asyncio.create_task(save_snapshots_periodically())
 
     yield  # App is running
 
+    extender.cancel()
+    metrics_saver.cancel()
+
 # Init FastAPI
 app = FastAPI(title='Wally API', version=VERSION, lifespan=lifespan, root_path="/api")
 
@@ -54,16 +86,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Request metrics, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Profile a request with ?profile or an X-Profile header
+app.add_middleware(ProfilerMiddleware)
+
 # Add routes
 app.include_router(transactions.router)
 app.include_router(recurring_transactions.router)
+app.include_router(analytics.router)
 app.include_router(categories.router)
 app.include_router(tags.router)
 app.include_router(currency.router)
 app.include_router(auth.router)
 app.include_router(api_keys.router)
+app.include_router(metrics.router)
 
 # Add root route
 @app.get("/", tags=["Root"])
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from anyio.to_thread import current_default_thread_limiter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .database import engine, async_engine
+
+# Every worker saves its metrics here, so /metrics reports the totals of all workers whichever one answers
+METRICS_DIR = Path("data/metrics")
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+METRICS = {}
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+        METRICS[name] = self
+
+    def merge(self, values: dict, other: dict):
+        for labels, value in other.items():
+            values[labels] = values.get(labels, 0) + value
+
+    def render(self, values: dict) -> list[str]:
+        if not values and not self.labels:
+            values = {(): 0}
+        return [f"{self.name}{format_labels(self.labels, labels)} {value}" for labels, value in sorted(values.items())]
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str):
+        with self.lock:
+            self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str):
+        with self.lock:
+            # One (non-cumulative) count per bucket, then the +Inf bucket and the sum
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def merge(self, values: dict, other: dict):
+        for labels, counts in other.items():
+            current = values.get(labels)
+            values[labels] = counts if current is None else [a + b for a, b in zip(current, counts)]
+
+    def render(self, values: dict) -> list[str]:
+        lines = []
+        for labels, counts in sorted(values.items()):
+            cumulative = 0
+            for bucket, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels((*self.labels, 'le'), (*labels, str(bucket)))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+# HTTP
+REQUESTS = Counter("wally_http_requests_total", "HTTP requests.", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("wally_http_request_duration_seconds", "HTTP request latency, until the last byte of the response is sent.", LATENCY_BUCKETS, ("method", "route"))
+REQUESTS_IN_FLIGHT = Gauge("wally_http_requests_in_flight", "HTTP requests being processed.")
+QUERIES_PER_REQUEST = Histogram("wally_http_request_db_queries", "Database queries run by an HTTP request.", COUNT_BUCKETS, ("method", "route"))
+ROWS_PER_REQUEST = Histogram("wally_http_request_db_rows", "Database rows loaded by an HTTP request.", ROW_BUCKETS, ("method", "route"))
+
+# Threadpool running the sync endpoints and dependencies
+THREADPOOL_SIZE = Gauge("wally_threadpool_size", "Threads available to sync endpoints.")
+THREADPOOL_BUSY = Gauge("wally_threadpool_busy", "Threads running sync endpoints.")
+THREADPOOL_WAITING = Gauge("wally_threadpool_waiting", "Tasks waiting for a free thread.")
+THREADPOOL_SATURATED = Counter("wally_threadpool_saturated_total", "HTTP requests received while every thread was busy.")
+
+# Database
+QUERY_SECONDS = Histogram("wally_db_query_duration_seconds", "SQLite statement execution time.", QUERY_BUCKETS)
+COMMIT_SECONDS = Histogram("wally_db_commit_duration_seconds", "Session commit time, including the flush of pending changes.", QUERY_BUCKETS)
+
+# Auth
+BCRYPT_SECONDS = Histogram("wally_bcrypt_duration_seconds", "bcrypt hashing time.", BCRYPT_BUCKETS, ("operation",))
+
+class RequestStats:
+    __slots__ = ("queries", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+# Stats of the HTTP request being processed (shared with the threadpool and async engine greenlets through the context)
+REQUEST_STATS: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+@event.listens_for(engine, "before_cursor_execute")
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(engine, "after_cursor_execute")
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def observe_query(conn, cursor, statement, parameters, context, executemany):
+    QUERY_SECONDS.observe(time.perf_counter() - conn.info["query_started"].pop())
+    stats = REQUEST_STATS.get()
+    if stats:
+        stats.queries += 1
+
+# Both ends on the session, so commits of raw connections are not timed and a failed commit leaves nothing to observe later
+@event.listens_for(Session, "before_commit")
+def start_commit_timer(session):
+    session.info["commit_started"] = time.perf_counter()
+
+@event.listens_for(Session, "after_commit", insert=True)
+def observe_commit(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_commit_timer(session, previous_transaction):
+    session.info.pop("commit_started", None)
+
+@event.listens_for(Session, "loaded_as_persistent")
+def count_loaded_row(session, instance):
+    stats = REQUEST_STATS.get()
+    if stats:
+        stats.rows += 1
+
+def count_rows(rows: int):
+    """Count rows read without loading ORM instances."""
+    stats = REQUEST_STATS.get()
+    if stats:
+        stats.rows += rows
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency, status, queries and rows of every request, labelled with its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        limiter = current_default_thread_limiter()
+        if limiter.borrowed_tokens >= limiter.total_tokens:
+            THREADPOOL_SATURATED.inc()
+
+        stats = RequestStats()
+        token = REQUEST_STATS.set(stats)
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_STATS.reset(token)
+
+            # Set by the router once matched; unmatched paths share one label to keep the series bounded
+            route = scope.get("route")
+            route = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_SECONDS.observe(duration, method, route)
+            QUERIES_PER_REQUEST.observe(stats.queries, method, route)
+            ROWS_PER_REQUEST.observe(stats.rows, method, route)
+
+def sample_threadpool():
+    """Update the threadpool gauges (must run on the event loop)."""
+    limiter = current_default_thread_limiter()
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_WAITING.set(limiter.statistics().tasks_waiting)
+
+def snapshot() -> dict:
+    snapshot = {}
+    for name, metric in METRICS.items():
+        with metric.lock:
+            snapshot[name] = [[list(labels), value.copy() if isinstance(value, list) else value] for labels, value in metric.values.items()]
+    return snapshot
+
+def save_snapshot():
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    path = METRICS_DIR / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot()))
+    os.replace(tmp, path)
+
+async def save_snapshots_periodically():
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+        sample_threadpool()
+        save_snapshot()
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def worker_snapshots() -> list[dict]:
+    """The live metrics of this worker and the last saved ones of the other running workers."""
+    snapshots = [snapshot()]
+    for path in METRICS_DIR.glob("*.json"):
+        pid = int(path.stem)
+        if pid == os.getpid():
+            continue
+        if not is_running(pid):
+            # Left by a stopped worker
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+def render_metrics() -> str:
+    """All workers' metrics in the Prometheus text exposition format."""
+    sample_threadpool()
+    snapshots = worker_snapshots()
+
+    lines = []
+    for name, metric in METRICS.items():
+        values = {}
+        for snapshot in snapshots:
+            metric.merge(values, {tuple(labels): value for labels, value in snapshot.get(name, [])})
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        lines.extend(metric.render(values))
+    return "\n".join(lines) + "\n"
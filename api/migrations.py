@@ -0,0 +1,398 @@
+import os
+import sys
+from sqlalchemy import inspect
+from sqlmodel import SQLModel
+
+from .caching import DATA_VERSION
+from .database import engine
+from .models.currency import DEFAULT_CURRENCIES
+# Register every table in SQLModel.metadata
+from .models import analytics, app, api_keys, categories, currency, recurring_transactions, tags, transactions  # noqa: F401
+
+# Rows per chunk for data backfills, committed separately so writers are never locked out for long
+BACKFILL_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+
+# Ordered upgrade steps: (version, description, function)
+MIGRATIONS = []
+
+def migration(version: int, description: str):
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        return func
+    return register
+
+# Keep the transaction_tags index in sync with the JSON tags column on every write path
+TAG_TRIGGERS = {
+    "transaction_tags_insert": """
+        CREATE TRIGGER transaction_tags_insert AFTER INSERT ON "transaction" BEGIN
+            INSERT OR IGNORE INTO transaction_tags (tag, transaction_id)
+            SELECT value, NEW.id FROM json_each(NEW.tags) WHERE type = 'text';
+        END
+    """,
+    "transaction_tags_update": """
+        CREATE TRIGGER transaction_tags_update AFTER UPDATE OF tags ON "transaction" BEGIN
+            DELETE FROM transaction_tags WHERE transaction_id = OLD.id;
+            INSERT OR IGNORE INTO transaction_tags (tag, transaction_id)
+            SELECT value, NEW.id FROM json_each(NEW.tags) WHERE type = 'text';
+        END
+    """,
+    "transaction_tags_delete": """
+        CREATE TRIGGER transaction_tags_delete AFTER DELETE ON "transaction" BEGIN
+            DELETE FROM transaction_tags WHERE transaction_id = OLD.id;
+        END
+    """,
+}
+
+# Count a transaction row in the suggestion of its name
+NAME_ADD = """
+    INSERT INTO transaction_names (name, category, last_used, last_date, count)
+    SELECT {row}.name, {row}.category, {row}.created_date, {row}.date, 1 WHERE {row}.name != ''
+    ON CONFLICT (name) DO UPDATE SET
+        category = CASE WHEN excluded.last_used >= last_used THEN excluded.category ELSE category END,
+        last_used = max(last_used, excluded.last_used),
+        last_date = max(last_date, excluded.last_date),
+        count = count + 1;
+"""
+
+# Stop counting a transaction row. The latest category and dates are only looked up again (through the
+# name indexes) when the row held them, so bulk updates and deletes of one name stay linear
+NAME_REMOVE = """
+    UPDATE transaction_names SET count = count - 1 WHERE name = {row}.name;
+    DELETE FROM transaction_names WHERE name = {row}.name AND count = 0;
+    UPDATE transaction_names
+    SET (category, last_used) = (SELECT category, created_date FROM "transaction" WHERE name = {row}.name ORDER BY created_date DESC LIMIT 1)
+    WHERE name = {row}.name AND last_used = {row}.created_date;
+    UPDATE transaction_names
+    SET last_date = (SELECT max(date) FROM "transaction" WHERE name = {row}.name)
+    WHERE name = {row}.name AND last_date = {row}.date;
+"""
+
+# Keep transaction_names (name suggestions) in sync with the transaction table
+NAME_TRIGGERS = {
+    "transaction_names_insert": f"""
+        CREATE TRIGGER transaction_names_insert AFTER INSERT ON "transaction" BEGIN
+            {NAME_ADD.format(row="NEW")}
+        END
+    """,
+    "transaction_names_update": f"""
+        CREATE TRIGGER transaction_names_update AFTER UPDATE OF name, category, date ON "transaction"
+        WHEN OLD.name IS NOT NEW.name OR OLD.category IS NOT NEW.category OR OLD.date IS NOT NEW.date BEGIN
+            {NAME_REMOVE.format(row="OLD")}
+            {NAME_ADD.format(row="NEW")}
+        END
+    """,
+    "transaction_names_delete": f"""
+        CREATE TRIGGER transaction_names_delete AFTER DELETE ON "transaction" BEGIN
+            {NAME_REMOVE.format(row="OLD")}
+        END
+    """,
+}
+
+# Full-text index over name, category and tags, returning the transaction id. Its rows are found again through
+# transaction_fts_keys, whose INTEGER PRIMARY KEY (unlike the rowid of "transaction") survives a VACUUM
+SEARCH_TABLES = [
+    "CREATE TABLE IF NOT EXISTS transaction_fts_keys (rowid INTEGER PRIMARY KEY, transaction_id TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transaction_fts USING fts5(name, category, tags, id UNINDEXED)",
+]
+
+# The transaction_fts rowid of a transaction
+SEARCH_ROWID = "(SELECT rowid FROM transaction_fts_keys WHERE transaction_id = {row}.id)"
+
+# The tags of a transaction row as indexed text. The column holds JSON with escaped non-ASCII characters
+# ("caf\u00e9"), so the decoded values are indexed instead
+SEARCH_TAGS = "(SELECT group_concat(value, ' ') FROM json_each({row}.tags) WHERE type = 'text')"
+
+# Keep transaction_fts in sync with the transaction table
+SEARCH_TRIGGERS = {
+    "transaction_fts_insert": f"""
+        CREATE TRIGGER transaction_fts_insert AFTER INSERT ON "transaction" BEGIN
+            INSERT INTO transaction_fts_keys (transaction_id) VALUES (NEW.id);
+            INSERT INTO transaction_fts (rowid, name, category, tags, id) VALUES (last_insert_rowid(), NEW.name, NEW.category, {SEARCH_TAGS.format(row="NEW")}, NEW.id);
+        END
+    """,
+    "transaction_fts_update": f"""
+        CREATE TRIGGER transaction_fts_update AFTER UPDATE OF name, category, tags ON "transaction" BEGIN
+            UPDATE transaction_fts SET name = NEW.name, category = NEW.category, tags = {SEARCH_TAGS.format(row="NEW")} WHERE rowid = {SEARCH_ROWID.format(row="NEW")};
+        END
+    """,
+    "transaction_fts_delete": f"""
+        CREATE TRIGGER transaction_fts_delete AFTER DELETE ON "transaction" BEGIN
+            DELETE FROM transaction_fts WHERE rowid = {SEARCH_ROWID.format(row="OLD")};
+            DELETE FROM transaction_fts_keys WHERE transaction_id = OLD.id;
+        END
+    """,
+}
+
+# Number of distinct tags of a transaction row
+TAG_COUNT = "(SELECT count(DISTINCT value) FROM json_each({row}.tags) WHERE type = 'text')"
+
+# Add (sign 1) or remove (sign -1) a transaction row from the monthly rollups. The tag rollup gets a row per
+# distinct tag (or '' when untagged), so its size grows with the tags rather than with their combinations
+SUMMARY_APPLY = """
+    INSERT INTO monthly_summary (month, type, category, total, count)
+    VALUES (strftime('%Y-%m', {row}.date), {row}.type, {row}.category, {sign} * {row}.amount, {sign})
+    ON CONFLICT (month, type, category) DO UPDATE SET total = total + excluded.total, count = count + excluded.count;
+    DELETE FROM monthly_summary
+    WHERE month = strftime('%Y-%m', {row}.date) AND type = {row}.type AND category = {row}.category AND count = 0;
+    INSERT INTO monthly_tag_summary (month, type, tag, total, share, count)
+    SELECT strftime('%Y-%m', {row}.date), {row}.type, tag, {sign} * {row}.amount, {sign} * {row}.amount * 1.0 / tags, {sign}
+    FROM (
+        SELECT DISTINCT value AS tag, {tag_count} AS tags FROM json_each({row}.tags) WHERE type = 'text'
+        UNION ALL SELECT '', 1 WHERE {tag_count} = 0
+    ) WHERE true
+    ON CONFLICT (month, type, tag) DO UPDATE SET total = total + excluded.total, share = share + excluded.share, count = count + excluded.count;
+    DELETE FROM monthly_tag_summary
+    WHERE month = strftime('%Y-%m', {row}.date) AND type = {row}.type AND count = 0;
+"""
+
+# Keep monthly_summary and monthly_tag_summary (dashboard totals) in sync with the transaction table
+SUMMARY_TRIGGERS = {
+    "monthly_summary_insert": f"""
+        CREATE TRIGGER monthly_summary_insert AFTER INSERT ON "transaction" BEGIN
+            {SUMMARY_APPLY.format(row="NEW", sign=1, tag_count=TAG_COUNT.format(row="NEW"))}
+        END
+    """,
+    "monthly_summary_update": f"""
+        CREATE TRIGGER monthly_summary_update AFTER UPDATE OF amount, type, category, date, tags ON "transaction" BEGIN
+            {SUMMARY_APPLY.format(row="OLD", sign=-1, tag_count=TAG_COUNT.format(row="OLD"))}
+            {SUMMARY_APPLY.format(row="NEW", sign=1, tag_count=TAG_COUNT.format(row="NEW"))}
+        END
+    """,
+    "monthly_summary_delete": f"""
+        CREATE TRIGGER monthly_summary_delete AFTER DELETE ON "transaction" BEGIN
+            {SUMMARY_APPLY.format(row="OLD", sign=-1, tag_count=TAG_COUNT.format(row="OLD"))}
+        END
+    """,
+}
+
+# Every trigger on the transaction table
+TRANSACTION_TRIGGERS = {**TAG_TRIGGERS, **NAME_TRIGGERS, **SEARCH_TRIGGERS, **SUMMARY_TRIGGERS}
+
+def rebuild_transaction_tags(conn):
+    conn.exec_driver_sql("DELETE FROM transaction_tags")
+    conn.exec_driver_sql("""
+        INSERT OR IGNORE INTO transaction_tags (tag, transaction_id)
+        SELECT j.value, t.id FROM "transaction" t, json_each(t.tags) j WHERE j.type = 'text'
+    """)
+
+def rebuild_transaction_names(conn):
+    conn.exec_driver_sql("DELETE FROM transaction_names")
+    conn.exec_driver_sql("""
+        INSERT INTO transaction_names (name, category, last_used, last_date, count)
+        SELECT t.name,
+            (SELECT category FROM "transaction" WHERE name = t.name ORDER BY created_date DESC LIMIT 1),
+            max(t.created_date), max(t.date), count(*)
+        FROM "transaction" t WHERE t.name != '' GROUP BY t.name
+    """)
+
+def rebuild_summaries(conn):
+    conn.exec_driver_sql("DELETE FROM monthly_summary")
+    conn.exec_driver_sql("""
+        INSERT INTO monthly_summary (month, type, category, total, count)
+        SELECT strftime('%Y-%m', date), type, category, sum(amount), count(*)
+        FROM "transaction" GROUP BY 1, 2, 3
+    """)
+    conn.exec_driver_sql("DELETE FROM monthly_tag_summary")
+    conn.exec_driver_sql(f"""
+        INSERT INTO monthly_tag_summary (month, type, tag, total, share, count)
+        SELECT strftime('%Y-%m', t.date), t.type, tags.tag, sum(t.amount), sum(t.amount * 1.0 / {TAG_COUNT.format(row="t")}), count(*)
+        FROM "transaction" t JOIN (
+            SELECT DISTINCT t.rowid AS transaction_rowid, j.value AS tag FROM "transaction" t, json_each(t.tags) j WHERE j.type = 'text'
+        ) tags ON tags.transaction_rowid = t.rowid
+        GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT strftime('%Y-%m', t.date), t.type, '', sum(t.amount), sum(t.amount), count(*)
+        FROM "transaction" t WHERE {TAG_COUNT.format(row="t")} = 0
+        GROUP BY 1, 2
+    """)
+
+def rebuild_search_index(conn):
+    """Repopulate transaction_fts (and its keys) from the transaction table."""
+    conn.exec_driver_sql("DELETE FROM transaction_fts")
+    conn.exec_driver_sql("DELETE FROM transaction_fts_keys")
+    conn.exec_driver_sql('INSERT INTO transaction_fts_keys (transaction_id) SELECT id FROM "transaction"')
+    conn.exec_driver_sql(f"""
+        INSERT INTO transaction_fts (rowid, name, category, tags, id)
+        SELECT k.rowid, t.name, t.category, {SEARCH_TAGS.format(row="t")}, t.id FROM transaction_fts_keys k JOIN "transaction" t ON t.id = k.transaction_id
+    """)
+
+def create_triggers(conn, triggers: dict):
+    for name, sql in triggers.items():
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        conn.exec_driver_sql(sql)
+
+def create_schema(conn):
+    """Create the latest schema on an empty database (tables, indexes and triggers)."""
+    SQLModel.metadata.create_all(conn)
+    for sql in SEARCH_TABLES:
+        conn.exec_driver_sql(sql)
+    create_triggers(conn, TRANSACTION_TRIGGERS)
+
+def backfill(conn, table: str, sql: str):
+    """Run `sql` over consecutive rowid ranges of `table` (bound as :start and :end), committing after each chunk.
+
+    Backfill statements must be idempotent, so an interrupted upgrade can simply run again.
+    """
+    last = conn.exec_driver_sql(f'SELECT max(rowid) FROM "{table}"').scalar() or 0
+    for start in range(0, last, BACKFILL_BATCH_SIZE):
+        conn.exec_driver_sql(sql, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+        conn.commit()
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def get_schema_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def set_schema_version(conn, version: int):
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+# ------------------------
+# Migrations
+# Version 0 is the schema created by create_all before migrations existed.
+# ------------------------
+@migration(1, "Track how far each recurring transaction has been materialized")
+def add_recurring_materialized_until(conn):
+    columns = [column["name"] for column in inspect(conn).get_columns("recurringtransaction")]
+    if "materializedUntil" not in columns:
+        conn.exec_driver_sql('ALTER TABLE recurringtransaction ADD COLUMN "materializedUntil" DATE')
+        # Existing recurring transactions were fully expanded on creation
+        conn.exec_driver_sql('UPDATE recurringtransaction SET "materializedUntil" = "endDate"')
+
+@migration(2, "Index transactions by tag")
+def add_transaction_tags(conn):
+    SQLModel.metadata.tables["transaction_tags"].create(conn, checkfirst=True)
+    for index in SQLModel.metadata.tables["transaction_tags"].indexes:
+        index.create(conn, checkfirst=True)
+    # Triggers first, so rows written while the backfill runs are indexed too
+    create_triggers(conn, TAG_TRIGGERS)
+    backfill(conn, "transaction", """
+        INSERT OR IGNORE INTO transaction_tags (tag, transaction_id)
+        SELECT j.value, t.id FROM "transaction" t, json_each(t.tags) j
+        WHERE t.rowid > :start AND t.rowid <= :end AND j.type = 'text'
+    """)
+
+@migration(3, "Replace single-column transaction indexes with composite indexes")
+def add_transaction_composite_indexes(conn):
+    for index in SQLModel.metadata.tables["transaction"].indexes:
+        index.create(conn, checkfirst=True)
+    # Superseded by composite indexes on the same leading column
+    for name in ["ix_transaction_name", "ix_transaction_recurringID", "ix_transaction_created_date", "ix_transaction_date"]:
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+
+@migration(4, "Add name suggestions for the transaction name search")
+def add_transaction_names(conn):
+    SQLModel.metadata.tables["transaction_names"].create(conn, checkfirst=True)
+    for index in SQLModel.metadata.tables["transaction_names"].indexes:
+        index.create(conn, checkfirst=True)
+    create_triggers(conn, NAME_TRIGGERS)
+    # One pass over the (name, created_date, category, date) index, so it is not chunked
+    rebuild_transaction_names(conn)
+
+@migration(5, "Add full-text search over transactions")
+def add_transaction_search(conn):
+    for sql in SEARCH_TABLES:
+        conn.exec_driver_sql(sql)
+    # Triggers first, so rows written while the backfill runs are indexed too
+    create_triggers(conn, SEARCH_TRIGGERS)
+    backfill(conn, "transaction", """
+        INSERT OR IGNORE INTO transaction_fts_keys (transaction_id)
+        SELECT id FROM "transaction" WHERE rowid > :start AND rowid <= :end
+    """)
+    backfill(conn, "transaction_fts_keys", f"""
+        INSERT INTO transaction_fts (rowid, name, category, tags, id)
+        SELECT k.rowid, t.name, t.category, {SEARCH_TAGS.format(row="t")}, t.id FROM transaction_fts_keys k JOIN "transaction" t ON t.id = k.transaction_id
+        WHERE k.rowid > :start AND k.rowid <= :end
+        AND k.rowid NOT IN (SELECT rowid FROM transaction_fts WHERE rowid > :start AND rowid <= :end)
+    """)
+
+@migration(6, "Add monthly summary rollups for the dashboard")
+def add_monthly_summaries(conn):
+    SQLModel.metadata.tables["monthly_summary"].create(conn, checkfirst=True)
+    SQLModel.metadata.tables["monthly_tag_summary"].create(conn, checkfirst=True)
+    create_triggers(conn, SUMMARY_TRIGGERS)
+    # Aggregates can't be filled chunk by chunk idempotently; a single GROUP BY pass is fast anyway
+    rebuild_summaries(conn)
+
+@migration(7, "Store amounts as integers in minor units")
+def store_amounts_in_minor_units(conn):
+    columns = [column["name"] for column in inspect(conn).get_columns("currency")]
+    if "exponent" not in columns:
+        conn.exec_driver_sql("ALTER TABLE currency ADD COLUMN exponent INTEGER NOT NULL DEFAULT 2")
+        for default in DEFAULT_CURRENCIES:
+            if "exponent" in default:
+                conn.exec_driver_sql("UPDATE currency SET exponent = ? WHERE name = ?", (default["exponent"], default["name"]))
+
+    # Scale by the decimals of the selected currency, unless some amounts have more (e.g. cents entered as yen)
+    exponent = conn.exec_driver_sql("""
+        SELECT c.exponent FROM appconfig a JOIN currency c ON c.name = a.value WHERE a.key = 'SELECTED_CURRENCY'
+    """).scalar()
+    if exponent is None:
+        exponent = 2
+    if exponent < 2 and conn.exec_driver_sql(f"""
+        SELECT 1 FROM "transaction" WHERE round(amount, {exponent}) != round(amount, 2)
+        UNION ALL SELECT 1 FROM recurringtransaction WHERE round(amount, {exponent}) != round(amount, 2)
+        LIMIT 1
+    """).first():
+        print("Some amounts have more decimals than the selected currency allows, keeping 2 decimals")
+        exponent = 2
+
+    # Not chunked, as rescaling isn't idempotent. The rollups are recomputed (as exact integer sums) rather than updated row by row
+    for name in SUMMARY_TRIGGERS:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    for table in ['"transaction"', "recurringtransaction"]:
+        conn.exec_driver_sql(f"UPDATE {table} SET amount = CAST(round(amount * {10 ** exponent}) AS INTEGER)")
+    create_triggers(conn, SUMMARY_TRIGGERS)
+    rebuild_summaries(conn)
+    conn.exec_driver_sql("INSERT OR REPLACE INTO appconfig (key, value) VALUES ('AMOUNT_EXPONENT', ?)", (str(exponent),))
+
+SCHEMA_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+def run_migrations():
+    """Bring data/wally.db up to SCHEMA_VERSION, one transaction per migration.
+
+    BEGIN IMMEDIATE takes the write lock before the version is read, so concurrent
+    workers starting together apply each migration exactly once.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        version = get_schema_version(conn)
+        if version == 0 and not inspect(conn).has_table("transaction"):
+            # New database: create the latest schema directly
+            create_schema(conn)
+            set_schema_version(conn, SCHEMA_VERSION)
+        elif version > SCHEMA_VERSION:
+            conn.rollback()
+            raise RuntimeError(f"Database schema version {version} is newer than this release supports ({SCHEMA_VERSION})")
+        conn.commit()
+
+        for target, description, upgrade in sorted(MIGRATIONS, key=lambda m: m[0]):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if get_schema_version(conn) >= target:
+                conn.rollback()
+                continue
+            print(f"Migrating database to version {target}: {description}")
+            try:
+                upgrade(conn)
+                set_schema_version(conn, target)
+                conn.commit()
+                DATA_VERSION.bump()
+            except Exception:
+                conn.rollback()
+                raise
+
+def rebuild_derived_tables():
+    """Recompute every trigger-maintained table (tag index, name suggestions, search index, monthly rollups) from the transactions."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        rebuild_transaction_tags(conn)
+        rebuild_transaction_names(conn)
+        rebuild_search_index(conn)
+        rebuild_summaries(conn)
+        conn.commit()
+    DATA_VERSION.bump()
+
+if __name__ == "__main__":
+    # Upgrade the database, and with "rebuild" also repair the derived tables: python -m api.migrations [rebuild]
+    run_migrations()
+    if sys.argv[1:] == ["rebuild"]:
+        rebuild_derived_tables()
+        print("Derived tables rebuilt.")
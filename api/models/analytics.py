@@ -0,0 +1,41 @@
+from typing import Literal
+from sqlalchemy import Column, Integer
+from sqlmodel import SQLModel, Field, String
+
+class CategorySummary(SQLModel):
+    month: str
+    type: Literal["expense", "income"]
+    category: str
+    total: str  # Decimal string, e.g. "10.50"
+    count: int
+
+class TagSummary(SQLModel):
+    month: str
+    type: Literal["expense", "income"]
+    tag: str | None  # None for untagged transactions
+    total: str  # Decimal string, e.g. "10.50", of every transaction with the tag
+    share: str  # Decimal string, each amount split evenly across the tags of its transaction
+    count: int
+
+class AnalyticsSummary(SQLModel):
+    categories: list[CategorySummary]
+    tags: list[TagSummary]
+
+class MonthlySummary(SQLModel, table=True):
+    """Totals per month × type × category, kept in sync with Transaction by triggers."""
+    __tablename__ = "monthly_summary"
+    month: str = Field(primary_key=True)  # YYYY-MM
+    type: str = Field(sa_type=String, primary_key=True)
+    category: str = Field(primary_key=True)
+    total: int = Field(sa_column=Column(Integer, nullable=False))  # In minor units
+    count: int
+
+class MonthlyTagSummary(SQLModel, table=True):
+    """Totals per month × type × tag ('' for untagged transactions), kept in sync with Transaction by triggers."""
+    __tablename__ = "monthly_tag_summary"
+    month: str = Field(primary_key=True)  # YYYY-MM
+    type: str = Field(sa_type=String, primary_key=True)
+    tag: str = Field(primary_key=True)
+    total: int = Field(sa_column=Column(Integer, nullable=False))  # In minor units
+    share: float  # In minor units, each amount divided by the number of tags of its transaction
+    count: int
@@ -1,10 +1,19 @@
+import hmac
+import hashlib
 import secrets
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field
 
+# Prefix of HMAC-SHA256 key hashes (keys created before were hashed with bcrypt)
+HMAC_PREFIX = "hmac-sha256$"
+
 def generate_api_key_id():
     return secrets.token_hex(6)
 
+def hash_api_key(api_key: str, secret_key: str) -> str:
+    # Keys are 256-bit random tokens, so a keyed fast hash is enough (no need for bcrypt)
+    return HMAC_PREFIX + hmac.new(secret_key.encode('utf-8'), api_key.encode('utf-8'), hashlib.sha256).hexdigest()
+
 class ApiKeys(SQLModel, table=True):
     id: str = Field(default_factory=generate_api_key_id, primary_key=True)
     key_hash: str
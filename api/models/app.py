@@ -1,4 +1,6 @@
 import secrets
+from typing import Literal
+from pydantic import BaseModel
 from sqlmodel import SQLModel, Field
 
 DEFAULT_CONFIG = {
@@ -9,8 +11,19 @@ DEFAULT_CONFIG = {
     "SELECTED_CURRENCY": "EUR",
     "CURRENCY_POSITION": "right",
     "LANGUAGE": "en",
+    "AMOUNT_EXPONENT": "2",  # Decimals of the stored amounts (see amounts.py)
 }
 
 class AppConfig(SQLModel, table=True):
     key: str = Field(primary_key=True)
     value: str
+
+class Settings(BaseModel):
+    SECRET_KEY: str
+    LOGIN_PAGE: bool
+    LOGIN_PASSWORD: str
+    LOGIN_TOKEN: str
+    SELECTED_CURRENCY: str
+    CURRENCY_POSITION: Literal["left", "right"]
+    LANGUAGE: str
+    AMOUNT_EXPONENT: int
@@ -1,8 +1,8 @@
 from sqlmodel import SQLModel, Field
 from typing import Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field as PydanticField
 
-# List of default currencies to insert
+# List of default currencies to insert (exponent: decimals of the currency, 2 unless set)
 DEFAULT_CURRENCIES = [
     {"name": "AED", "symbol": "AED"},
     {"name": "AUD", "symbol": "A$"},
@@ -18,8 +18,8 @@ DEFAULT_CURRENCIES = [
     {"name": "IDR", "symbol": "Rp"},
     {"name": "ILS", "symbol": "₪"},
     {"name": "INR", "symbol": "₹"},
-    {"name": "JPY", "symbol": "¥"},
-    {"name": "KRW", "symbol": "₩"},
+    {"name": "JPY", "symbol": "¥", "exponent": 0},
+    {"name": "KRW", "symbol": "₩", "exponent": 0},
     {"name": "MAD", "symbol": "DH"},
     {"name": "MXN", "symbol": "Mex$"},
     {"name": "MYR", "symbol": "RM"},
@@ -32,13 +32,14 @@ DEFAULT_CURRENCIES = [
     {"name": "THB", "symbol": "฿"},
     {"name": "TRY", "symbol": "₺"},
     {"name": "USD", "symbol": "$"},
-    {"name": "VND", "symbol": "₫"},
+    {"name": "VND", "symbol": "₫", "exponent": 0},
     {"name": "ZAR", "symbol": "R"},
 ]
 
 class CurrencyBase(SQLModel):
     name: str = Field(primary_key=True)
     symbol: str
+    exponent: int = Field(default=2)
 
 class Currency(CurrencyBase, table=True):
     pass
@@ -46,6 +47,9 @@ class Currency(CurrencyBase, table=True):
 class CurrencyPublic(CurrencyBase):
     pass
 
+class CurrencyUpdated(CurrencyPublic):
+    rounded: int
+
 class CurrencySettings(BaseModel):
     currencies: list[CurrencyPublic]
     selected: str
@@ -54,7 +58,9 @@ class CurrencySettings(BaseModel):
 class CurrencyCreate(BaseModel):
     name: str
     symbol: str
+    exponent: int = PydanticField(default=2, ge=0, le=4)
 
 class CurrencyUpdate(BaseModel):
     name: str
     symbol: str
+    exponent: int | None = PydanticField(default=None, ge=0, le=4)
@@ -3,7 +3,7 @@ from uuid import UUID, uuid4
 from datetime import date, datetime
 from decimal import Decimal
 from pydantic import model_validator
-from sqlalchemy import Column, JSON, Numeric
+from sqlalchemy import Column, Integer, JSON
 from sqlmodel import SQLModel, Field, String
 from dateutil.relativedelta import relativedelta
 
@@ -11,7 +11,7 @@ class RecurringTransactionBase(SQLModel):
     name: str = Field(default="", index=True)
     category: str = Field(index=True)
     tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    amount: Decimal = Field(sa_column=Column(Numeric(10, 2)))
+    amount: Decimal
     type: Literal["expense", "income"] = Field(sa_type=String, default="expense", index=True)
     startDate: date = Field(default_factory=date.today, index=True)
     endDate: date = Field(default_factory=date.today, index=True)
@@ -36,6 +36,9 @@ class RecurringTransactionBase(SQLModel):
 class RecurringTransaction(RecurringTransactionBase, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     created_date: datetime = Field(default_factory=datetime.now, index=True)
+    materializedUntil: date | None = Field(default=None)
+    # In minor units (see amounts.py)
+    amount: int = Field(sa_column=Column(Integer, nullable=False))
 
 class RecurringTransactionCreate(RecurringTransactionBase):
     pass
@@ -58,8 +61,11 @@ class RecurringTransactionPublic(SQLModel):
     name: str
     category: str
     tags: List[str]
-    amount: float
+    amount: str  # Decimal string, e.g. "10.50"
     type: Literal["expense", "income"]
     startDate: date
     endDate: date
     frequency: Literal["daily", "weekly", "monthly", "yearly"]
+
+class RecurringTransactionUpdated(RecurringTransactionPublic):
+    updatedTransactions: int
@@ -1,3 +1,4 @@
+from uuid import UUID
 from sqlmodel import SQLModel, Field
 
 class TagBase(SQLModel):
@@ -14,3 +15,9 @@ class TagUpdate(TagBase):
 
 class TagPublic(TagBase):
     pass
+
+class TransactionTag(SQLModel, table=True):
+    """Index of the tags of each transaction, kept in sync with Transaction.tags by triggers."""
+    __tablename__ = "transaction_tags"
+    tag: str = Field(primary_key=True)
+    transaction_id: UUID = Field(primary_key=True, index=True)
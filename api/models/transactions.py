@@ -3,16 +3,16 @@ from uuid import UUID, uuid4
 from datetime import date as d, datetime as dt
 from decimal import Decimal
 from pydantic import model_validator
-from sqlalchemy import Column, JSON, Numeric
+from sqlalchemy import Column, Index, Integer, JSON, text
 from sqlmodel import SQLModel, Field, String
 
 class TransactionBase(SQLModel):
-    name: str = Field(default="", index=True)
+    name: str = Field(default="")
     category: str = Field(index=True)
     tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    amount: Decimal = Field(sa_column=Column(Numeric(10, 2)))
+    amount: Decimal
     type: Literal["expense", "income"] = Field(sa_type=String, default="expense", index=True)
-    date: d = Field(default_factory=d.today, index=True)
+    date: d = Field(default_factory=d.today)
 
     @model_validator(mode='after')
     def check_model(self):
@@ -22,9 +22,37 @@ class TransactionBase(SQLModel):
         return self
 
 class Transaction(TransactionBase, table=True):
+    __table_args__ = (
+        # Listing newest first, including the (created_date, id) pagination cursor
+        Index("ix_transaction_created_date_id", "created_date", "id"),
+        # Date ranges, newest first without a sort
+        Index("ix_transaction_date_created_date", "date", "created_date"),
+        # Name search and latest category per name, answered from the index alone
+        Index("ix_transaction_name_created_date", "name", "created_date", "category", "date"),
+        # Latest date per name, when the name suggestions lose their latest transaction
+        Index("ix_transaction_name_date", "name", "date"),
+        # Recurring edits and deletes ("future" occurrences)
+        Index("ix_transaction_recurringID_date", "recurringID", "date"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    recurringID: str = Field(default="", index=True)
-    created_date: dt = Field(default_factory=dt.now, index=True)
+    recurringID: str = Field(default="")
+    created_date: dt = Field(default_factory=dt.now)
+    # In minor units (see amounts.py)
+    amount: int = Field(sa_column=Column(Integer, nullable=False))
+
+class TransactionName(SQLModel, table=True):
+    """Name suggestions: one row per distinct transaction name, kept in sync with Transaction by triggers."""
+    __tablename__ = "transaction_names"
+    __table_args__ = (
+        # Most used names first, read in index order until the LIMIT is reached
+        Index("ix_transaction_names_count_name", text('"count" DESC'), "name"),
+    )
+    name: str = Field(primary_key=True)
+    category: str  # Category of the most recently created transaction
+    last_used: dt  # Most recent created_date
+    last_date: d  # Most recent transaction date
+    count: int = Field(default=0)
 
 class TransactionCreate(TransactionBase):
     pass
@@ -43,6 +71,6 @@ class TransactionPublic(SQLModel):
     name: str
     category: str
     tags: List[str]
-    amount: Decimal
+    amount: str  # Decimal string, e.g. "10.50"
     type: Literal["expense", "income"]
     date: d
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+from urllib.parse import parse_qs
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from pyinstrument import Profiler
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .database import engine, async_engine
+from .routers.auth import check_login
+
+# Statements slower than this are logged with their parameters and query plan (off by default: the parameters hold the user's data)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+# Characters of the parameters written to the slow query log
+MAX_LOGGED_PARAMETERS = 1000
+
+# Sampling interval of the request profiler
+PROFILER_INTERVAL = 0.001
+
+# Values of `?profile` / `X-Profile` asking for a profile, and the report format of each
+PROFILE_MODES = {"": "html", "1": "html", "true": "html", "yes": "html", "html": "html", "text": "text"}
+
+logger = logging.getLogger("wally.slow_queries")
+
+# Statements with a query plan
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+def explain_query_plan(conn, statement: str, parameters) -> str:
+    try:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    except Exception as e:
+        return f"  (unavailable: {e})"
+    # Rows are (id, parent, notused, detail): indent each step under its parent
+    depth = {0: 0}
+    lines = []
+    for id, parent, _, detail in rows:
+        depth[id] = depth.get(parent, 0) + 1
+        lines.append("  " * depth[id] + detail)
+    return "\n".join(lines) or "  (none)"
+
+def start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+def log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+    if duration_ms < SLOW_QUERY_MS or statement.startswith("EXPLAIN"):
+        return
+
+    # A plan can't be explained for a batch of parameter sets
+    if executemany or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        plan = "  (none)"
+    else:
+        plan = explain_query_plan(conn, statement, parameters)
+    logger.warning(f"Slow query ({duration_ms:.1f} ms): {statement}\nParameters: {repr(parameters)[:MAX_LOGGED_PARAMETERS]}\nQuery plan:\n{plan}")
+
+if SLOW_QUERY_MS > 0:
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", start_slow_query_timer)
+        event.listen(target, "after_cursor_execute", log_slow_query)
+
+class ProfilerMiddleware:
+    """ASGI middleware answering requests sent with `?profile` or an `X-Profile` header with a sampling profile of the request instead of its response.
+
+    The report is HTML, or text with `profile=text` / `X-Profile: text`; other values (e.g. `profile=0`) leave the request alone.
+    Only logged in users can profile a request.
+    Time spent by sync endpoints in the threadpool or by SQLite in the aiosqlite thread shows up as awaiting it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        mode = request.headers.get("x-profile")
+        if mode is None and b"profile" in scope["query_string"]:
+            mode = parse_qs(scope["query_string"].decode(), keep_blank_values=True).get("profile", [None])[0]
+        mode = PROFILE_MODES.get(mode.strip().lower()) if mode is not None else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with AsyncSession(async_engine) as db:
+                await check_login(request, Response(), db)
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard_response(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = Profiler(interval=PROFILER_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard_response)
+        finally:
+            profiler.stop()
+
+        headers = {"X-Profiled-Status": str(status)}
+        if mode == "text":
+            response = PlainTextResponse(profiler.output_text(), headers=headers)
+        else:
+            response = HTMLResponse(profiler.output_html(), headers=headers)
+        await response(scope, receive, send)
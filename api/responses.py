@@ -0,0 +1,61 @@
+import json
+from typing import AsyncIterable, Callable, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, String, type_coerce
+
+from .amounts import format_amount
+from .metrics import count_rows
+from .models.transactions import Transaction, TransactionPublic
+from .models.recurring_transactions import RecurringTransaction, RecurringTransactionPublic
+
+# Lean read path for large lists: the public columns are read as stored (hex ids, JSON text tags, ISO dates, integer amounts),
+# without ORM instances or response_model validation, and written straight into the JSON response
+
+TRANSACTION_COLUMNS = [type_coerce(getattr(Transaction, c), String) for c in TransactionPublic.model_fields]
+RECURRING_TRANSACTION_COLUMNS = [type_coerce(getattr(RecurringTransaction, c), String) for c in RecurringTransactionPublic.model_fields]
+
+encode_string = json.JSONEncoder(ensure_ascii=False).encode
+
+def format_uuid(hex: str) -> str:
+    return f"{hex[:8]}-{hex[8:12]}-{hex[12:16]}-{hex[16:20]}-{hex[20:]}"
+
+def transaction_serializer(exponent: int) -> Callable[[Row], str]:
+    """Serializer of TransactionPublic rows as JSON, with amounts stored with `exponent` decimals (type and date are constrained values, so they need no escaping)."""
+    def serialize(row: Row) -> str:
+        id, recurring_id, name, category, tags, amount, type, date = row
+        return (
+            f'{{"id":"{format_uuid(id)}","recurringID":{encode_string(recurring_id)},"name":{encode_string(name)},'
+            f'"category":{encode_string(category)},"tags":{tags or "[]"},"amount":"{format_amount(amount, exponent)}","type":"{type}","date":"{date}"}}'
+        )
+    return serialize
+
+def recurring_transaction_serializer(exponent: int) -> Callable[[Row], str]:
+    """Serializer of RecurringTransactionPublic rows as JSON."""
+    def serialize(row: Row) -> str:
+        id, name, category, tags, amount, type, start_date, end_date, frequency = row
+        return (
+            f'{{"id":"{format_uuid(id)}","name":{encode_string(name)},"category":{encode_string(category)},"tags":{tags or "[]"},'
+            f'"amount":"{format_amount(amount, exponent)}","type":"{type}","startDate":"{start_date}","endDate":"{end_date}","frequency":"{frequency}"}}'
+        )
+    return serialize
+
+def json_array(rows: Sequence[Row], serialize: Callable[[Row], str]) -> str:
+    count_rows(len(rows))
+    return "[" + ",".join(map(serialize, rows)) + "]"
+
+class JSONArrayResponse(StreamingResponse):
+    """Streams a JSON array, one chunk per partition of rows, so the whole response is never held in memory."""
+    media_type = "application/json"
+
+    def __init__(self, partitions: AsyncIterable[Sequence[Row]], serialize: Callable[[Row], str], headers=None):
+        super().__init__(self.encode(partitions, serialize), headers=headers)
+
+    @staticmethod
+    async def encode(partitions: AsyncIterable[Sequence[Row]], serialize: Callable[[Row], str]):
+        separator = "["
+        async for rows in partitions:
+            if rows:
+                count_rows(len(rows))
+                yield separator + ",".join(map(serialize, rows))
+                separator = ","
+        yield "]" if separator == "," else "[]"
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Annotated
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..amounts import format_amount
+from ..caching import check_not_modified
+from ..database import get_async_session
+from ..models.analytics import AnalyticsSummary, MonthlySummary, MonthlyTagSummary
+from ..settings import get_settings
+from .auth import check_login
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+router = APIRouter(tags=["Analytics"], dependencies=[Depends(check_login)])
+
+def summary_statement(model, start: str | None = None, end: str | None = None):
+    """The plain rows of a rollup table (MonthlySummary or MonthlyTagSummary) in an inclusive month range, by month."""
+    statement = select(*model.__table__.columns).order_by(model.month)
+    if start:
+        statement = statement.where(model.month >= start)
+    if end:
+        statement = statement.where(model.month <= end)
+    return statement
+
+@router.get("/analytics/summary", response_model=AnalyticsSummary, dependencies=[Depends(check_not_modified)])
+async def read_summary(
+    db: Annotated[AsyncSession, Depends(get_async_session)],
+    start: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+    end: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+):
+    """Totals grouped by month × type × category and by month × type × tag. Both bounds are inclusive months (YYYY-MM) and can be omitted to leave the range open."""
+    # Read plain rows from the rollup tables, which hold at most one row per month × type × category (or tag)
+    exponent = get_settings().AMOUNT_EXPONENT
+    categories = [
+        {"month": row.month, "type": row.type, "category": row.category, "total": format_amount(row.total, exponent), "count": row.count}
+        for row in (await db.exec(summary_statement(MonthlySummary, start, end))).all()
+    ]
+
+    # Totals per tag, with the share the dashboard charts (each amount split evenly across its tags)
+    tags = [
+        {
+            "month": row.month, "type": row.type, "tag": row.tag or None, "total": format_amount(row.total, exponent),
+            "share": format_amount(round(row.share), exponent), "count": row.count,
+        }
+        for row in (await db.exec(summary_statement(MonthlyTagSummary, start, end))).all()
+    ]
+
+    return {"categories": categories, "tags": tags}
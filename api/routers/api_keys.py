@@ -1,11 +1,11 @@
 import secrets
-import bcrypt
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Annotated
 from sqlmodel import Session, select, func
 
 from ..database import get_session
-from ..models.api_keys import ApiKeys, ApiKeyPublic
+from ..models.api_keys import ApiKeys, ApiKeyPublic, generate_api_key_id, hash_api_key
+from ..settings import get_settings
 from .auth import check_login
 
 MAX_API_KEYS = 3
@@ -27,14 +27,15 @@ def create_api_key(
     if count >= MAX_API_KEYS:
         raise HTTPException(status_code=400, detail=f"Maximum of {MAX_API_KEYS} API keys allowed")
 
-    # Generate a random API key
-    raw_key = secrets.token_hex(32)
+    # Generate a random API key, prefixed with its id so it can be looked up directly
+    api_key_id = generate_api_key_id()
+    raw_key = f"{api_key_id}.{secrets.token_hex(32)}"
 
     # Hash the key for storage
-    key_hash = bcrypt.hashpw(raw_key.encode('utf-8'), bcrypt.gensalt()).decode()
+    key_hash = hash_api_key(raw_key, get_settings().SECRET_KEY)
 
     # Create the record
-    api_key = ApiKeys(key_hash=key_hash)
+    api_key = ApiKeys(id=api_key_id, key_hash=key_hash)
     db.add(api_key)
     db.commit()
     db.refresh(api_key)
@@ -1,4 +1,6 @@
 import jwt
+import hmac
+import time
 import bcrypt
 import random
 import string
@@ -7,13 +9,17 @@ from datetime import datetime, timedelta, timezone
 from typing import Annotated
 from pydantic import BaseModel
 from fastapi import Depends, APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlmodel import select
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import get_session, get_async_session
+from ..metrics import BCRYPT_SECONDS
 from ..models.app import AppConfig
-from ..models.api_keys import ApiKeys
+from ..settings import get_settings, invalidate_settings
+from ..models.api_keys import ApiKeys, HMAC_PREFIX, hash_api_key
 
 class Login(BaseModel):
     password: str
@@ -24,6 +30,18 @@ class LoginPassword(BaseModel):
 ACCESS_EXPIRE_MINUTES = 5
 REFRESH_EXPIRE_DAYS = 365
 
+# Minimum seconds between two last_used writes of the same API key (per worker)
+API_KEY_LAST_USED_INTERVAL = 60
+api_key_last_used = {}
+
+def checkpw(password: bytes, hashed_password: bytes) -> bool:
+    with BCRYPT_SECONDS.time("checkpw"):
+        return bcrypt.checkpw(password, hashed_password)
+
+def hashpw(password: bytes) -> bytes:
+    with BCRYPT_SECONDS.time("hashpw"):
+        return bcrypt.hashpw(password, bcrypt.gensalt())
+
 def is_https(request: Request) -> bool:
     """Auto-detect if the request was made over HTTPS using the X-Forwarded-Proto header."""
     return request.headers.get("x-forwarded-proto", "http") == "https"
@@ -39,15 +57,16 @@ def login(
 ) -> JSONResponse:
     
     # Retrieve login settings
-    login_page = int(db.get(AppConfig, "LOGIN_PAGE").value)
-    login_password = db.get(AppConfig, "LOGIN_PASSWORD").value
+    settings = get_settings()
+    login_page = settings.LOGIN_PAGE
+    login_password = settings.LOGIN_PASSWORD
 
     # Check if login page is enabled
     if not login_page:
         return JSONResponse("Login page is disabled", status_code=200)
 
     # Check database password
-    database_match = bcrypt.checkpw(login.password.encode('utf-8'), login_password.encode('utf-8'))
+    database_match = checkpw(login.password.encode('utf-8'), login_password.encode('utf-8'))
 
     # Check recovery password if it exists
     recover_password_file = Path("password.txt").resolve()
@@ -55,8 +74,8 @@ def login(
 
     if recover_password_file.exists():
         recover_password_value = recover_password_file.read_text(encoding="utf-8").strip()
-        recover_password_hash = bcrypt.hashpw(recover_password_value.encode('utf-8'), bcrypt.gensalt())
-        recover_match = bcrypt.checkpw(login.password.encode('utf-8'), recover_password_hash)
+        recover_password_hash = hashpw(recover_password_value.encode('utf-8'))
+        recover_match = checkpw(login.password.encode('utf-8'), recover_password_hash)
         if recover_match:
             # Remove recovery file after successful use
             recover_password_file.unlink(missing_ok=True)
@@ -70,13 +89,14 @@ def login(
         recover_password_file.unlink(missing_ok=True)
 
     # Generate an access token and refresh_token
-    secret_key = db.get(AppConfig, "SECRET_KEY").value
+    secret_key = settings.SECRET_KEY
     access_token = jwt.encode({"sub": "admin", "exp": datetime.now(timezone.utc) + timedelta(minutes=ACCESS_EXPIRE_MINUTES)}, secret_key, algorithm='HS512')
     refresh_token = jwt.encode({"sub": "admin", "exp": datetime.now(timezone.utc) + timedelta(days=REFRESH_EXPIRE_DAYS)}, secret_key, algorithm='HS512')
 
     # Store the updated refresh token in DB
     db.get(AppConfig, "LOGIN_TOKEN").value = refresh_token
     db.commit()
+    invalidate_settings()
 
     # Create a JSON response with the access token
     response = JSONResponse(f"Welcome back!", status_code=200)
@@ -93,28 +113,63 @@ def logout(response: Response):
     response.delete_cookie(key="access_token")
     return {"message": "Logged out successfully"}
 
-def check_login (
+async def verify_api_key(api_key: str, secret_key: str, db: AsyncSession) -> ApiKeys | None:
+    key_hash = hash_api_key(api_key, secret_key)
+
+    # Keys are issued as "<id>.<secret>": a single primary key lookup
+    api_key_id, _, secret = api_key.partition(".")
+    if secret:
+        ak = await db.get(ApiKeys, api_key_id)
+        if ak and hmac.compare_digest(ak.key_hash, key_hash):
+            return ak
+        return None
+
+    # Legacy keys without id: match an already upgraded hash first
+    ak = (await db.exec(select(ApiKeys).where(ApiKeys.key_hash == key_hash))).first()
+    if ak:
+        return ak
+
+    # Otherwise check the remaining bcrypt hashes and upgrade the matching one, so bcrypt only runs once per key
+    for ak in (await db.exec(select(ApiKeys).where(ApiKeys.key_hash.not_like(f"{HMAC_PREFIX}%")))).all():
+        if await run_in_threadpool(checkpw, api_key.encode('utf-8'), ak.key_hash.encode('utf-8')):
+            ak.key_hash = key_hash
+            db.add(ak)
+            await db.commit()
+            # The commit expires the key, and async sessions can't lazy load it back
+            await db.refresh(ak)
+            return ak
+    return None
+
+async def check_login (
     request: Request,
     response: Response,
-    db: Annotated[Session, Depends(get_session)],
+    db: Annotated[AsyncSession, Depends(get_async_session)],
 ):
     # Check if login is enabled
-    if int(db.get(AppConfig, "LOGIN_PAGE").value):
+    settings = get_settings()
+    if settings.LOGIN_PAGE:
         # Check for API key in header
         api_key = request.headers.get("x-api-key")
         if api_key:
-            api_keys = db.exec(select(ApiKeys)).all()
-            for ak in api_keys:
-                if bcrypt.checkpw(api_key.encode('utf-8'), ak.key_hash.encode('utf-8')):
-                    # Update last_used timestamp
-                    ak.last_used = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-                    db.add(ak)
-                    db.commit()
-                    return
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        secret_key = db.get(AppConfig, "SECRET_KEY").value
-        login_token = db.get(AppConfig, "LOGIN_TOKEN").value
+            ak = await verify_api_key(api_key, settings.SECRET_KEY, db)
+            if not ak:
+                raise HTTPException(status_code=401, detail="Invalid API key")
+
+            # Update last_used timestamp, at most once per interval
+            now = time.monotonic()
+            if now - api_key_last_used.get(ak.id, float("-inf")) >= API_KEY_LAST_USED_INTERVAL:
+                api_key_last_used[ak.id] = now
+                await db.exec(
+                    update(ApiKeys)
+                    .where(ApiKeys.id == ak.id)
+                    .values(last_used=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            return
+
+        secret_key = settings.SECRET_KEY
+        login_token = settings.LOGIN_TOKEN
         access_token = request.cookies.get("access_token")
 
         if not access_token:
@@ -138,18 +193,14 @@ def check_login (
 
 
 @router.get("/login/check", response_model=bool)
-def get_login_page_enabled(
-    db: Annotated[Session, Depends(get_session)],
+async def get_login_page_enabled(
     _ = Depends(check_login),
 ):
-    return db.get(AppConfig, "LOGIN_PAGE").value
+    return get_settings().LOGIN_PAGE
 
 @router.get("/language")
-def get_language(
-    db: Annotated[Session, Depends(get_session)],
-):
-    language_config = db.get(AppConfig, "LANGUAGE")
-    return {"language": language_config.value}
+async def get_language():
+    return {"language": get_settings().LANGUAGE}
 
 @router.put("/language/{language}")
 def update_language(
@@ -161,6 +212,7 @@ def update_language(
     config.value = language
     db.add(config)
     db.commit()
+    invalidate_settings()
     return {"message": "Language updated"}
 
 @router.post("/login/password")
@@ -173,10 +225,11 @@ def set_login_password(
         db.get(AppConfig, "LOGIN_PAGE").value = False
     else:
         db.get(AppConfig, "LOGIN_PAGE").value = True
-        password_hash = bcrypt.hashpw(login.password.encode('utf-8'), bcrypt.gensalt()).decode()
+        password_hash = hashpw(login.password.encode('utf-8')).decode()
         db.get(AppConfig, "LOGIN_PASSWORD").value = password_hash
 
     db.commit()
+    invalidate_settings()
     return "Password changed"
 
 @router.post("/login/recover")
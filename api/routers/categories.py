@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Annotated
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from ..database import get_session
+from ..caching import check_not_modified
+from ..database import get_session, get_async_session
 from ..models.categories import Category, CategoryCreate, CategoryPublic, CategoryUpdate
 from ..models.transactions import Transaction
 from ..models.recurring_transactions import RecurringTransaction
@@ -11,12 +13,25 @@ from .auth import check_login
 
 router = APIRouter(tags=["Categories"], dependencies=[Depends(check_login)])
 
-@router.get("/categories", response_model=list[str])
-def read_categories(
-    db: Annotated[Session, Depends(get_session)]
+def rename_category(model, category_name: str, new_category_name: str):
+    """Build an UPDATE that moves every row of `model` (Transaction or RecurringTransaction) to another category."""
+    return (
+        update(model)
+        .where(model.category == category_name)
+        .values(category=new_category_name)
+        .execution_options(synchronize_session=False)
+    )
+
+def count_category(model, category_name: str):
+    """Build a SELECT counting the rows of `model` in a category."""
+    return select(func.count()).select_from(model).where(model.category == category_name)
+
+@router.get("/categories", response_model=list[str], dependencies=[Depends(check_not_modified)])
+async def read_categories(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     statement = select(Category).order_by(Category.name)
-    categories = db.exec(statement).all()
+    categories = (await db.exec(statement)).all()
     return sorted([c.name for c in categories], key=str.lower)
 
 @router.post("/categories", response_model=CategoryPublic)
@@ -46,19 +61,9 @@ def update_category(
     
     new_category_name = category_update.name
     
-    # Update all transactions that use this category
-    statement = select(Transaction).where(Transaction.category == category_name)
-    transactions = db.exec(statement).all()
-    for transaction in transactions:
-        transaction.category = new_category_name
-        db.add(transaction)
-    
-    # Update all recurring transactions that use this category
-    statement = select(RecurringTransaction).where(RecurringTransaction.category == category_name)
-    recurring_transactions = db.exec(statement).all()
-    for recurring_transaction in recurring_transactions:
-        recurring_transaction.category = new_category_name
-        db.add(recurring_transaction)
+    # Update all transactions and recurring transactions that use this category
+    for model in (Transaction, RecurringTransaction):
+        db.exec(rename_category(model, category_name, new_category_name))
     
     # Update the category with new data
     category_data = category_update.model_dump(exclude_unset=True)
@@ -83,8 +88,7 @@ def delete_category(
         raise HTTPException(status_code=404, detail="This category does not exist.")
     
     # Check if any transactions are using this category
-    statement = select(Transaction).where(Transaction.category == category_name)
-    transactions_count = len(db.exec(statement).all())
+    transactions_count = db.exec(count_category(Transaction, category_name)).one()
     
     if transactions_count > 0:
         raise HTTPException(
@@ -93,8 +97,7 @@ def delete_category(
         )
     
     # Check if any recurring transactions are using this category
-    statement = select(RecurringTransaction).where(RecurringTransaction.category == category_name)
-    recurring_count = len(db.exec(statement).all())
+    recurring_count = db.exec(count_category(RecurringTransaction, category_name)).one()
     
     if recurring_count > 0:
         raise HTTPException(
@@ -1,36 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Annotated, Literal
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
-from ..models.currency import Currency, CurrencyPublic, CurrencySettings, CurrencyCreate, CurrencyUpdate
+from ..amounts import rescale_amounts
+from ..caching import check_not_modified
+from ..database import get_session, get_async_session
+from ..models.currency import Currency, CurrencyPublic, CurrencyUpdated, CurrencySettings, CurrencyCreate, CurrencyUpdate
 from ..models.app import AppConfig
+from ..settings import get_settings, invalidate_settings
 from .auth import check_login
 
 router = APIRouter(tags=["Currency"], dependencies=[Depends(check_login)])
 
-@router.get("/currency", response_model=CurrencySettings)
-def read_currency(
-    db: Annotated[Session, Depends(get_session)]
+@router.get("/currency", response_model=CurrencySettings, dependencies=[Depends(check_not_modified)])
+async def read_currency(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
-    currencies = db.exec(select(Currency).order_by(Currency.name)).all()
-    selected = db.get(AppConfig, "SELECTED_CURRENCY").value
-    position = db.get(AppConfig, "CURRENCY_POSITION").value
-    return {"currencies": currencies, "selected": selected, "position": position}
+    currencies = (await db.exec(select(Currency).order_by(Currency.name))).all()
+    settings = get_settings()
+    return {"currencies": currencies, "selected": settings.SELECTED_CURRENCY, "position": settings.CURRENCY_POSITION}
 
 @router.put("/currency/{currency_name}")
 def change_currency(
     currency_name: str,
     db: Annotated[Session, Depends(get_session)]
 ):
-    if not db.get(Currency, currency_name):
+    currency = db.get(Currency, currency_name)
+    if not currency:
         raise HTTPException(status_code=404, detail="This currency does not exist.")
     
     config = db.get(AppConfig, "SELECTED_CURRENCY")
     config.value = currency_name
     db.add(config)
+
+    # Store the amounts with the decimals of the new currency (rounding the ones with more)
+    rounded = rescale_amounts(db, currency.exponent)
     db.commit()
-    return {"message": "Currency updated"}
+    invalidate_settings()
+    if rounded:
+        return {"message": f"Currency updated. {rounded} amounts were rounded to {currency.exponent} decimals.", "rounded": rounded}
+    return {"message": "Currency updated", "rounded": 0}
 
 @router.put("/currency/position/{position}")
 def change_currency_position(
@@ -41,6 +51,7 @@ def change_currency_position(
     config.value = position
     db.add(config)
     db.commit()
+    invalidate_settings()
     return {"message": "Currency position updated"}
 
 @router.post("/currency", response_model=CurrencyPublic)
@@ -51,13 +62,13 @@ def create_currency(
     if db.get(Currency, currency.name):
         raise HTTPException(status_code=400, detail="Currency already exists.")
     
-    new_currency = Currency(name=currency.name, symbol=currency.symbol)
+    new_currency = Currency(name=currency.name, symbol=currency.symbol, exponent=currency.exponent)
     db.add(new_currency)
     db.commit()
     db.refresh(new_currency)
     return new_currency
 
-@router.put("/currency/{old_name}/update", response_model=CurrencyPublic)
+@router.put("/currency/{old_name}/update", response_model=CurrencyUpdated)
 def update_currency(
     old_name: str,
     currency: CurrencyUpdate,
@@ -70,19 +81,24 @@ def update_currency(
     if old_name != currency.name and db.get(Currency, currency.name):
         raise HTTPException(status_code=400, detail="Currency name already exists.")
     
+    exponent = db_currency.exponent if currency.exponent is None else currency.exponent
+
     # Update selected currency config if needed
     selected = db.get(AppConfig, "SELECTED_CURRENCY")
+    rounded = 0
     if selected.value == old_name:
         selected.value = currency.name
         db.add(selected)
+        rounded = rescale_amounts(db, exponent)
     
     # Delete old and create new (since name is primary key)
     db.delete(db_currency)
-    new_currency = Currency(name=currency.name, symbol=currency.symbol)
+    new_currency = Currency(name=currency.name, symbol=currency.symbol, exponent=exponent)
     db.add(new_currency)
     db.commit()
+    invalidate_settings()
     db.refresh(new_currency)
-    return new_currency
+    return {**new_currency.model_dump(), "rounded": rounded}
 
 @router.delete("/currency/{currency_name}")
 def delete_currency(
@@ -94,8 +110,7 @@ def delete_currency(
         raise HTTPException(status_code=404, detail="Currency not found.")
     
     # Prevent deleting the selected currency
-    selected = db.get(AppConfig, "SELECTED_CURRENCY")
-    if selected.value == currency_name:
+    if get_settings().SELECTED_CURRENCY == currency_name:
         raise HTTPException(status_code=400, detail="Cannot delete the currently selected currency. Please select a different currency before deleting this one.")
     
     db.delete(db_currency)
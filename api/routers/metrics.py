@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..metrics import render_metrics
+from .auth import check_login
+
+router = APIRouter(tags=["Metrics"], dependencies=[Depends(check_login)])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    """Request, database, threadpool and bcrypt metrics of all workers, in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,25 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import Annotated
-from uuid import UUID
-from sqlmodel import Session, select, desc
-from sqlalchemy import update, delete
-from datetime import timedelta, date
+from uuid import UUID, uuid4
+from sqlmodel import Session, select, desc, or_
+from sqlalchemy import update, delete, insert
+from datetime import timedelta, date, datetime
 from dateutil.relativedelta import relativedelta
 
-from ..database import get_session
+from ..database import engine, get_session
 from ..models.transactions import Transaction
-from ..models.recurring_transactions import RecurringTransaction, RecurringTransactionCreate, RecurringTransactionUpdate, RecurringTransactionDelete, RecurringTransactionPublic
+from ..amounts import commit_amounts, format_amount, parse_amount
+from ..responses import RECURRING_TRANSACTION_COLUMNS, json_array, recurring_transaction_serializer
+from ..settings import get_settings
+from ..models.recurring_transactions import RecurringTransaction, RecurringTransactionCreate, RecurringTransactionUpdate, RecurringTransactionDelete, RecurringTransactionPublic, RecurringTransactionUpdated
 from .auth import check_login
 
+# Occurrences are only created this many months ahead; a background task extends them as time passes
+RECURRING_HORIZON_MONTHS = int(os.getenv("RECURRING_HORIZON_MONTHS", "12"))
+RECURRING_EXTEND_INTERVAL = 3600
+
 router = APIRouter(tags=["Recurring Transactions"], dependencies=[Depends(check_login)])
 
+# Statement builders, shared by the endpoints and the query plan tests (tests/test_query_plans.py)
+def recurring_transactions_statement():
+    """RECURRING_TRANSACTION_COLUMNS newest first, as listed by GET /recurring."""
+    return select(*RECURRING_TRANSACTION_COLUMNS).order_by(desc(RecurringTransaction.created_date))
+
+def update_occurrences_statement(recurring_transaction_id: UUID, apply_to: str, values: dict):
+    """Build an UPDATE of the occurrences of a recurring transaction (only the ones after today when apply_to is "future")."""
+    statement = (
+        update(Transaction)
+        .where(Transaction.recurringID == str(recurring_transaction_id))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if apply_to == 'future':
+        statement = statement.where(Transaction.date > date.today())
+    return statement
+
+def delete_occurrences_statement(recurring_transaction_id: UUID, apply_to: str):
+    """Build a DELETE of the occurrences of a recurring transaction (only the ones after today when apply_to is "future")."""
+    statement = delete(Transaction).where(Transaction.recurringID == str(recurring_transaction_id))
+    if apply_to == 'future':
+        statement = statement.where(Transaction.date > date.today())
+    return statement
+
 @router.get("/recurring", response_model=list[RecurringTransactionPublic])
 def read_recurring_transactions(
     db: Annotated[Session, Depends(get_session)]
 ):
-    statement = select(RecurringTransaction).order_by(desc(RecurringTransaction.created_date))
-    recurring_transactions = db.exec(statement).all()
-    return recurring_transactions
+    rows = db.connection().execute(recurring_transactions_statement()).all()
+    serialize = recurring_transaction_serializer(get_settings().AMOUNT_EXPONENT)
+    return Response(json_array(rows, serialize), media_type="application/json")
 
 @router.get("/recurring/{recurring_transaction_id}", response_model=list[RecurringTransactionPublic])
 def get_recurring_transaction_by_id(
@@ -27,29 +59,30 @@ def get_recurring_transaction_by_id(
     db: Annotated[Session, Depends(get_session)]
 ):
     recurring_transaction = db.get(RecurringTransaction, recurring_transaction_id)
-    return [recurring_transaction] if recurring_transaction else []
+    return [to_public(recurring_transaction)] if recurring_transaction else []
 
 @router.post("/recurring", response_model=RecurringTransactionPublic)
 def create_recurring_transaction(
     recurring_transaction: RecurringTransactionCreate,
     db: Annotated[Session, Depends(get_session)]
 ):
-    new_recurring_transaction = RecurringTransaction.model_validate(recurring_transaction)
+    exponent = get_settings().AMOUNT_EXPONENT
+    new_recurring_transaction = RecurringTransaction.model_validate(recurring_transaction, update={"amount": parse_amount(recurring_transaction.amount, exponent)})
     db.add(new_recurring_transaction)
 
     # Create Transactions for the Recurring Transaction
     create_transactions_from_recurring(new_recurring_transaction, db)
 
     # Commit the changes to the database
-    db.commit()
+    commit_amounts(db, exponent)
 
     # Refresh the new Recurring Transaction
     db.refresh(new_recurring_transaction)
 
     # Return the created Recurring Transaction
-    return new_recurring_transaction
+    return to_public(new_recurring_transaction)
 
-@router.put("/recurring/{recurring_transaction_id}", response_model=RecurringTransactionPublic)
+@router.put("/recurring/{recurring_transaction_id}", response_model=RecurringTransactionUpdated)
 def update_recurring_transaction(
     recurring_transaction_id: UUID,
     recurring_transaction: RecurringTransactionUpdate,
@@ -61,19 +94,26 @@ def update_recurring_transaction(
         raise HTTPException(status_code=404, detail="This recurring transaction does not exist")
 
     # Modify the existing Recurring Transaction
-    db_recurring_transaction.sqlmodel_update(recurring_transaction.model_dump(exclude_unset=True))
+    exponent = get_settings().AMOUNT_EXPONENT
+    db_recurring_transaction.sqlmodel_update(to_stored_values(recurring_transaction, exponent))
 
     # Update new transactions based on the updated Recurring Transaction
-    update_transactions_from_recurring(recurring_transaction_id, recurring_transaction, db)
+    updated_transactions = update_transactions_from_recurring(recurring_transaction_id, recurring_transaction, exponent, db)
+
+    # Create the occurrences now within reach (e.g. if endDate was extended)
+    create_transactions_from_recurring(db_recurring_transaction, db)
 
     # Commit the changes to the database
-    db.commit()
+    commit_amounts(db, exponent)
 
     # Refresh the updated Recurring Transaction
     db.refresh(db_recurring_transaction)
 
-    # Return the updated Recurring Transaction
-    return db_recurring_transaction
+    # Return the updated Recurring Transaction with the number of transactions changed
+    return RecurringTransactionUpdated.model_validate(db_recurring_transaction, update={
+        "amount": format_amount(db_recurring_transaction.amount, get_settings().AMOUNT_EXPONENT),
+        "updatedTransactions": updated_transactions,
+    })
 
 @router.delete("/recurring/{recurring_transaction_id}")
 def delete_recurring_transaction(
@@ -98,26 +138,32 @@ def delete_recurring_transaction(
     # Return a success message
     return {"ok": True}
 
-def create_transactions_from_recurring (
+def to_public(recurring_transaction: RecurringTransaction) -> RecurringTransactionPublic:
+    return RecurringTransactionPublic.model_validate(recurring_transaction, update={"amount": format_amount(recurring_transaction.amount, get_settings().AMOUNT_EXPONENT)})
+
+def to_stored_values(recurring_transaction: RecurringTransactionUpdate, exponent: int) -> dict:
+    """The provided fields of an update, with the amount in minor units."""
+    values = recurring_transaction.model_dump(exclude_unset=True)
+    if values.get("amount") is not None:
+        values["amount"] = parse_amount(values["amount"], exponent)
+    return values
+
+def get_horizon() -> date:
+    return date.today() + relativedelta(months=RECURRING_HORIZON_MONTHS)
+
+def get_occurrences (
     recurring_transaction: RecurringTransaction,
-    db: Session
-):
-    start_date = recurring_transaction.startDate
-    end_date = recurring_transaction.endDate
+    after: date | None,
+    until: date
+) -> list[date]:
+    """Occurrence dates in the (after, until] window. Dates are always stepped from startDate so every window yields the same schedule."""
     frequency = recurring_transaction.frequency
-    current_date = start_date
-
-    while current_date <= end_date:
-        transaction = Transaction(
-            name=recurring_transaction.name,
-            category=recurring_transaction.category,
-            tags=recurring_transaction.tags,
-            amount=recurring_transaction.amount,
-            type=recurring_transaction.type,
-            date=current_date,
-            recurringID=str(recurring_transaction.id)
-        )
-        db.add(transaction)
+    current_date = recurring_transaction.startDate
+    dates = []
+
+    while current_date <= until:
+        if after is None or current_date > after:
+            dates.append(current_date)
 
         # Increment date based on frequency
         if frequency == "daily":
@@ -129,29 +175,93 @@ def create_transactions_from_recurring (
         elif frequency == "yearly":
             current_date += relativedelta(years=1)
 
-def update_transactions_from_recurring (
-    recurring_transaction_id: UUID,
-    recurring_transaction: RecurringTransactionUpdate,
+    return dates
+
+def insert_occurrences (
+    recurring_transaction: RecurringTransaction,
+    after: date | None,
+    until: date,
+    db: Session
+) -> int:
+    dates = get_occurrences(recurring_transaction, after, until)
+    if dates:
+        now = datetime.now()
+        db.exec(insert(Transaction), params=[{
+            "id": uuid4(),
+            "name": recurring_transaction.name,
+            "category": recurring_transaction.category,
+            "tags": recurring_transaction.tags,
+            "amount": recurring_transaction.amount,
+            "type": recurring_transaction.type,
+            "date": current_date,
+            "recurringID": str(recurring_transaction.id),
+            "created_date": now,
+        } for current_date in dates])
+    return len(dates)
+
+def create_transactions_from_recurring (
+    recurring_transaction: RecurringTransaction,
     db: Session
 ):
-    # Get transactions associated with the recurring transaction
-    stmt = select(Transaction).where(Transaction.recurringID == str(recurring_transaction_id))
-    if recurring_transaction.applyTo == 'future':
-        stmt = stmt.where(Transaction.date > date.today())
+    # Only materialize up to the horizon, the rest is created by extend_recurring_transactions
+    after = recurring_transaction.materializedUntil
+    until = min(recurring_transaction.endDate, get_horizon())
+    if after is None or after < until:
+        insert_occurrences(recurring_transaction, after, until, db)
+        recurring_transaction.materializedUntil = until
 
-    transactions = db.exec(stmt).all()
+def extend_recurring_transactions() -> int:
+    """Materialize pending occurrences of every recurring transaction up to the current horizon."""
+    horizon = get_horizon()
+    created = 0
+    with Session(engine) as db:
+        stmt = (
+            select(RecurringTransaction)
+            .where(or_(RecurringTransaction.materializedUntil == None, RecurringTransaction.materializedUntil < RecurringTransaction.endDate))
+            .where(or_(RecurringTransaction.materializedUntil == None, RecurringTransaction.materializedUntil < horizon))
+        )
+        pending = db.exec(stmt).all()
+        db.expunge_all()
+        db.commit()
 
+        for recurring_transaction in pending:
+            after = recurring_transaction.materializedUntil
+            until = min(recurring_transaction.endDate, horizon)
+
+            # Claim the window first, so concurrent workers never create the same occurrences twice
+            claimed = db.exec(
+                update(RecurringTransaction)
+                .where(RecurringTransaction.id == recurring_transaction.id)
+                .where(RecurringTransaction.materializedUntil == after)
+                .values(materializedUntil=until)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed:
+                # Read the row again under the write lock, so a rescale or an edit since the first read is not missed
+                current = db.get(RecurringTransaction, recurring_transaction.id)
+                created += insert_occurrences(current, after, until, db)
+            db.commit()
+    return created
+
+def update_transactions_from_recurring (
+    recurring_transaction_id: UUID,
+    recurring_transaction: RecurringTransactionUpdate,
+    exponent: int,
+    db: Session
+) -> int:
     # Convert the update object to a dict of only provided fields
-    updates = recurring_transaction.model_dump(exclude_unset=True)
+    updates = to_stored_values(recurring_transaction, exponent)
 
     # Get all valid Transaction fields
-    transaction_fields = set(Transaction.__fields__.keys())
+    transaction_fields = set(Transaction.model_fields.keys())
 
     # Apply only the provided fields that exist on Transaction
-    for transaction in transactions:
-        for key, value in updates.items():
-            if key in transaction_fields:
-                setattr(transaction, key, value)
+    values = {key: value for key, value in updates.items() if key in transaction_fields}
+    if not values:
+        return 0
+
+    # Update transactions associated with the recurring transaction in a single statement
+    return db.exec(update_occurrences_statement(recurring_transaction_id, recurring_transaction.applyTo, values)).rowcount
 
 def delete_transactions_from_recurring (
     recurring_transaction_id: UUID,
@@ -161,11 +271,8 @@ def delete_transactions_from_recurring (
     # Get the current date
     today = date.today()
 
-    # Prepare the query to delete transactions associated with the recurring transaction
-    stmt = delete(Transaction).where(Transaction.recurringID == str(recurring_transaction_id))
-    if recurring_transaction.applyTo == 'future':
-        stmt = stmt.where(Transaction.date > today)
-    db.exec(stmt)
+    # Delete transactions associated with the recurring transaction
+    db.exec(delete_occurrences_statement(recurring_transaction_id, recurring_transaction.applyTo))
 
     # If only deleting future transactions, remove recurringID from past transactions
     if recurring_transaction.applyTo == 'future':
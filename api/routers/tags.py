@@ -1,22 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Annotated
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update, func, case
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from ..database import get_session
-from ..models.tags import Tag, TagCreate, TagPublic, TagUpdate
+from ..caching import check_not_modified
+from ..database import get_session, get_async_session
+from ..models.tags import Tag, TagCreate, TagPublic, TagUpdate, TransactionTag
 from ..models.transactions import Transaction
 from ..models.recurring_transactions import RecurringTransaction
 from .auth import check_login
 
 router = APIRouter(tags=["Tags"], dependencies=[Depends(check_login)])
 
-@router.get("/tags", response_model=list[str])
-def read_tags(
-    db: Annotated[Session, Depends(get_session)]
+def replace_tag(model, tag_name: str, new_tag_name: str | None):
+    """Build an UPDATE that renames a tag inside the JSON tags column, or removes it if new_tag_name is None."""
+    tags = func.json_each(model.tags).table_valued("value")
+    if new_tag_name is None:
+        new_tags = select(func.json_group_array(tags.c.value)).where(tags.c.value != tag_name)
+    else:
+        new_tags = select(func.json_group_array(case((tags.c.value == tag_name, new_tag_name), else_=tags.c.value)))
+
+    # Transactions are found through the tag index, recurring transactions are few enough to scan
+    if model is Transaction:
+        affected = model.id.in_(select(TransactionTag.transaction_id).where(TransactionTag.tag == tag_name))
+    else:
+        affected = select(tags.c.value).where(tags.c.value == tag_name).exists()
+
+    return (
+        update(model)
+        .where(affected)
+        .values(tags=new_tags.scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+
+@router.get("/tags", response_model=list[str], dependencies=[Depends(check_not_modified)])
+async def read_tags(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     statement = select(Tag).order_by(Tag.name)
-    tags = db.exec(statement).all()
+    tags = (await db.exec(statement)).all()
     return sorted([t.name for t in tags], key=str.lower)
 
 @router.post("/tags", response_model=TagPublic)
@@ -46,23 +69,9 @@ def update_tag(
     
     new_tag_name = tag_update.name
     
-    # Update all transactions that use this tag
-    statement = select(Transaction)
-    transactions = db.exec(statement).all()
-    for transaction in transactions:
-        if tag_name in transaction.tags:
-            # Replace the old tag name with the new one
-            transaction.tags = [new_tag_name if t == tag_name else t for t in transaction.tags]
-            db.add(transaction)
-    
-    # Update all recurring transactions that use this tag
-    statement = select(RecurringTransaction)
-    recurring_transactions = db.exec(statement).all()
-    for recurring_transaction in recurring_transactions:
-        if tag_name in recurring_transaction.tags:
-            # Replace the old tag name with the new one
-            recurring_transaction.tags = [new_tag_name if t == tag_name else t for t in recurring_transaction.tags]
-            db.add(recurring_transaction)
+    # Replace the old tag name with the new one in all transactions and recurring transactions
+    db.exec(replace_tag(Transaction, tag_name, new_tag_name))
+    db.exec(replace_tag(RecurringTransaction, tag_name, new_tag_name))
     
     # Update the tag with new data
     tag_data = tag_update.model_dump(exclude_unset=True)
@@ -86,23 +95,9 @@ def delete_tag(
     if not tag:
         raise HTTPException(status_code=404, detail="This tag does not exist.")
     
-    # Remove the tag from all transactions
-    statement = select(Transaction)
-    transactions = db.exec(statement).all()
-    for transaction in transactions:
-        if tag_name in transaction.tags:
-            # Remove this tag from the tags list
-            transaction.tags = [t for t in transaction.tags if t != tag_name]
-            db.add(transaction)
-    
-    # Remove the tag from all recurring transactions
-    statement = select(RecurringTransaction)
-    recurring_transactions = db.exec(statement).all()
-    for recurring_transaction in recurring_transactions:
-        if tag_name in recurring_transaction.tags:
-            # Remove this tag from the tags list
-            recurring_transaction.tags = [t for t in recurring_transaction.tags if t != tag_name]
-            db.add(recurring_transaction)
+    # Remove the tag from all transactions and recurring transactions
+    db.exec(replace_tag(Transaction, tag_name, None))
+    db.exec(replace_tag(RecurringTransaction, tag_name, None))
     
     db.delete(tag)
     db.commit()
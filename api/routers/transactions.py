@@ -1,196 +1,369 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from typing import Annotated
-from uuid import UUID
-from sqlmodel import Session, select, desc
-from datetime import date
+import io
+import csv
+import json
+import math
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, UploadFile
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import Field, ValidationError
+from pydantic.json_schema import SkipJsonSchema
+from typing import Annotated, Iterable, Literal
+from uuid import UUID, uuid4
+from sqlalchemy import String, column, table, text, tuple_, type_coerce
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select, desc, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import date, datetime
+from decimal import Decimal
 from dateutil.relativedelta import relativedelta
 
-from ..database import get_session
-from ..models.transactions import Transaction, TransactionCreate, TransactionUpdate, TransactionPublic
+from ..amounts import commit_amounts, format_amount, parse_amount, to_minor_units
+from ..caching import check_not_modified
+from ..database import engine, get_session, get_async_session
+from ..models.transactions import Transaction, TransactionCreate, TransactionUpdate, TransactionPublic, TransactionName
+from ..models.tags import TransactionTag
+from ..responses import TRANSACTION_COLUMNS, JSONArrayResponse, json_array, transaction_serializer
+from ..settings import get_settings
 from .auth import check_login
 
+MAX_PAGE_SIZE = 1000
+NAME_SEARCH_LIMIT = 10
+SEARCH_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = ["name", "category", "tags", "amount", "type", "date"]
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_ERRORS = 100
+
 router = APIRouter(tags=["Transactions"], dependencies=[Depends(check_login)])
 
-@router.get("/transactions", response_model=list[TransactionPublic])
-def read_transactions(
-    db: Annotated[Session, Depends(get_session)]
+def encode_cursor(created_date: str, transaction_id: str) -> str:
+    value = f"{created_date}|{transaction_id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_date, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_date), UUID(transaction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def stream_partitions(db: AsyncSession, statement):
+    result = await (await db.connection()).stream(statement)
+    async for partition in result.partitions(STREAM_CHUNK_SIZE):
+        yield partition
+
+def stream_transactions(db: AsyncSession, statement, headers=None) -> JSONArrayResponse:
+    """Stream the rows of a TRANSACTION_COLUMNS query as a JSON array."""
+    return JSONArrayResponse(stream_partitions(db, statement), transaction_serializer(get_settings().AMOUNT_EXPONENT), headers)
+
+def to_public(transaction: Transaction) -> TransactionPublic:
+    return TransactionPublic.model_validate(transaction, update={"amount": format_amount(transaction.amount, get_settings().AMOUNT_EXPONENT)})
+
+# Statement builders, shared by the endpoints and the query plan tests (tests/test_query_plans.py)
+def transactions_statement(
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    tag: str | None = None,
+    type: str | None = None,
+    name: str | None = None,
+):
+    """TRANSACTION_COLUMNS newest first, as listed by GET /transactions."""
+    statement = select(*TRANSACTION_COLUMNS).order_by(desc(Transaction.created_date), desc(Transaction.id))
+    if start:
+        statement = statement.where(Transaction.date >= start)
+    if end:
+        statement = statement.where(Transaction.date <= end)
+    if category:
+        statement = statement.where(Transaction.category == category)
+    if tag:
+        statement = statement.where(Transaction.id.in_(select(TransactionTag.transaction_id).where(TransactionTag.tag == tag)))
+    if type:
+        statement = statement.where(Transaction.type == type)
+    if name:
+        statement = statement.where(Transaction.name.ilike(f"%{name}%"))
+    return statement
+
+def search_statement(
+    q: str,
+    exponent: int,
+    start: date | None = None,
+    end: date | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    type: str | None = None,
+):
+    """TRANSACTION_COLUMNS newest first, of the transactions matching the FTS5 query `q`. Amounts are compared in minor units of `exponent` decimals."""
+    matches = select(column("id")).select_from(table("transaction_fts")).where(text("transaction_fts MATCH :q").bindparams(q=q))
+    statement = (
+        select(*TRANSACTION_COLUMNS)
+        .where(Transaction.id.in_(matches))
+        .order_by(desc(Transaction.created_date), desc(Transaction.id))
+    )
+    if start:
+        statement = statement.where(Transaction.date >= start)
+    if end:
+        statement = statement.where(Transaction.date <= end)
+    if min_amount is not None:
+        statement = statement.where(Transaction.amount >= math.ceil(min_amount.scaleb(exponent)))
+    if max_amount is not None:
+        statement = statement.where(Transaction.amount <= math.floor(max_amount.scaleb(exponent)))
+    if type:
+        statement = statement.where(Transaction.type == type)
+    return statement
+
+def after_cursor(statement, created_date: datetime, transaction_id: UUID):
+    """Keyset pagination on (created_date, id), as a row value comparison so it is a range search of the index."""
+    return statement.where(tuple_(Transaction.created_date, Transaction.id) < tuple_(created_date, transaction_id))
+
+def date_range_statement(first_day: date | None, next_month: date):
+    """TRANSACTION_COLUMNS dated in [first_day, next_month), latest date first, as read by the month and range endpoints."""
+    statement = select(*TRANSACTION_COLUMNS).where(Transaction.date < next_month)
+    if first_day:
+        statement = statement.where(Transaction.date >= first_day)
+    return statement.order_by(desc(Transaction.date), desc(Transaction.created_date))
+
+def name_suggestion_statements(q: str, since: date) -> list:
+    """Names starting with `q`, then the ones only containing it, each read in (count, name) index order (so the caller limits them without sorting)."""
+    starts_with = TransactionName.name.ilike(f"{q}%")
+    return [
+        select(TransactionName.name, TransactionName.category)
+        .where(condition)
+        .where(TransactionName.last_date >= since)
+        .order_by(desc(TransactionName.count), TransactionName.name)
+        for condition in [starts_with, TransactionName.name.ilike(f"%{q}%") & ~starts_with]
+    ]
+
+async def read_page(db: AsyncSession, statement, response: Response, limit: int | None, cursor: str | None) -> Response:
+    """Run a (created_date, id) descending TRANSACTION_COLUMNS query one page at a time, returning the next page cursor in the X-Next-Cursor header."""
+    if cursor:
+        statement = after_cursor(statement, *decode_cursor(cursor))
+    if not limit:
+        return stream_transactions(db, statement, response.headers)
+
+    # The cursor also needs the created_date of the last row
+    statement = statement.add_columns(type_coerce(Transaction.created_date, String)).limit(limit + 1)
+    rows = (await (await db.connection()).execute(statement)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1][-1], rows[-1][0])
+
+    serialize = transaction_serializer(get_settings().AMOUNT_EXPONENT)
+    return Response(json_array([row[:-1] for row in rows], serialize), media_type="application/json", headers=response.headers)
+
+@router.get("/transactions", response_model=list[TransactionPublic], dependencies=[Depends(check_not_modified)])
+async def read_transactions(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_session)],
+    limit: Annotated[int | None, Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+    cursor: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    category: str | None = None,
+    tag: str | None = None,
+    type: Literal["expense", "income"] | None = None,
+    name: str | None = None,
 ):
-    statement = select(Transaction).order_by(desc(Transaction.created_date))
-    transactions = db.exec(statement).all()
-    return transactions
+    """List transactions, newest first. When `limit` is set, results are paginated and the cursor for the next page is returned in the X-Next-Cursor header."""
+    statement = transactions_statement(start, end, category, tag, type, name)
+    return await read_page(db, statement, response, limit, cursor)
+
+@router.get("/transactions/search", response_model=list[TransactionPublic])
+async def search_transactions(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_session)],
+    q: Annotated[str, Query(min_length=1)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = SEARCH_PAGE_SIZE,
+    cursor: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    type: Literal["expense", "income"] | None = None,
+):
+    """Full-text search over name, category and tags, newest first. `q` uses the SQLite FTS5 query syntax: prefixes (`coff*`), `AND`/`OR`/`NOT`, "phrases" and column filters (`category:food`). Paginated like GET /transactions."""
+    statement = search_statement(q, get_settings().AMOUNT_EXPONENT, start, end, min_amount, max_amount, type)
+    try:
+        return await read_page(db, statement, response, limit, cursor)
+    except OperationalError:
+        # Malformed FTS5 query (syntax error, unterminated string, unknown column filter)
+        raise HTTPException(status_code=400, detail="Invalid search query")
+
+def tags_to_csv_cell(tags: list[str]) -> str:
+    """Encode tags as a single CSV cell the same way the web client does (a nested comma-separated list, quoting tags that need it)."""
+    cells = []
+    for tag in tags:
+        if tag != tag.strip() or any(c in tag for c in ',"\r\n'):
+            tag = '"' + tag.replace('"', '""') + '"'
+        cells.append(tag)
+    return ",".join(cells)
+
+def csv_cell_to_tags(cell: str | None) -> list[str]:
+    """Decode a tags cell written by tags_to_csv_cell, trimming whitespace and dropping empty tags."""
+    if not cell or not cell.strip():
+        return []
+    row = next(csv.reader([cell.strip()]), [])
+    return [t.strip() for t in row if t.strip()]
+
+def export_rows(format: Literal["csv", "ndjson"]):
+    columns = [getattr(Transaction, c) for c in TransactionPublic.model_fields]
+    statement = (
+        select(*columns)
+        .order_by(desc(Transaction.created_date))
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    exponent = get_settings().AMOUNT_EXPONENT
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    # A dedicated sync session, as the endpoint has no request session and this generator is iterated in the threadpool while streaming
+    with Session(engine) as db:
+        for partition in db.exec(statement).partitions():
+            for row in partition:
+                values = row._asdict()
+                values["amount"] = format_amount(values["amount"], exponent)
+                if format == "csv":
+                    values["tags"] = tags_to_csv_cell(values["tags"] or [])
+                    writer.writerow([values[c] for c in EXPORT_COLUMNS])
+                else:
+                    buffer.write(TransactionPublic.model_validate(values).model_dump_json() + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@router.get("/transactions/export")
+def export_transactions(
+    format: Literal["csv", "ndjson"] = "csv",
+):
+    """Stream every transaction as CSV (the import format) or as newline-delimited JSON."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    return StreamingResponse(export_rows(format), media_type=media_type, headers=headers)
 
 @router.get("/transactions/id/{transaction_id}", response_model=list[TransactionPublic])
-def get_transaction_by_id(
+async def get_transaction_by_id(
     transaction_id: UUID,
-    db: Annotated[Session, Depends(get_session)]
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
-    transaction = db.get(Transaction, transaction_id)
-    return [transaction] if transaction else []
+    transaction = await db.get(Transaction, transaction_id)
+    return [to_public(transaction)] if transaction else []
 
 @router.get("/transactions/names/search")
-def search_transaction_names(
-    db: Annotated[Session, Depends(get_session)],
+async def search_transaction_names(
+    db: Annotated[AsyncSession, Depends(get_async_session)],
     q: str
 ):
     """Search for unique transaction names containing the query string (last year only, max 10 results). Returns name and most recently used category."""
     # Get date from one year ago
     today = date.today()
     one_year_ago = today - relativedelta(years=1)
-    
-    # Search for distinct names containing the query (case-insensitive) from last year
-    stmt = (
-        select(Transaction.name)
-        .distinct()
-        .where(Transaction.name.ilike(f"%{q}%"))
-        .where(Transaction.name != "")
-        .where(Transaction.date >= one_year_ago)
-        .order_by(Transaction.name)
-        .limit(10)
-    )
-    names = db.exec(stmt).all()
-
-    # For each name, find the most recently used category
-    results = []
-    for name in names:
-        cat_stmt = (
-            select(Transaction.category)
-            .where(Transaction.name == name)
-            .order_by(desc(Transaction.created_date))
-            .limit(1)
-        )
-        category = db.exec(cat_stmt).first()
-        results.append({"name": name, "category": category or ""})
-
-    return results
-
-@router.get("/transactions/date/{year}-{month}", response_model=list[TransactionPublic])
-def read_transactions_by_date(
+
+    # Names starting with the query first, then the ones containing it, each most frequently used first
+    names = []
+    for stmt in name_suggestion_statements(q, one_year_ago):
+        names += (await db.exec(stmt.limit(NAME_SEARCH_LIMIT - len(names)))).all()
+        if len(names) >= NAME_SEARCH_LIMIT:
+            break
+    return [{"name": name, "category": category} for name, category in names]
+
+@router.get("/transactions/date/{year}-{month}", response_model=list[TransactionPublic], dependencies=[Depends(check_not_modified)])
+async def read_transactions_by_date(
     year: Annotated[int, Path(..., ge=1, le=9999)],
     month: Annotated[int, Path(..., ge=1, le=12)],
-    db: Annotated[Session, Depends(get_session)]
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     first_day = date(year, month, 1)
     next_month = date(year + (month // 12), (month % 12) + 1, 1)
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.created_date))
-    )
-    results = db.exec(stmt).all()
-    return results
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt, response.headers)
 
 @router.get("/transactions/past-3-months", response_model=list[TransactionPublic])
-def get_transactions_past_3_months(
-    db: Annotated[Session, Depends(get_session)]
+async def get_transactions_past_3_months(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     today = date.today()
     first_day = (today.replace(day=1) - relativedelta(months=2))
     next_month = (today.replace(day=1) + relativedelta(months=1))
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.date))
-    )
-    return db.exec(stmt).all()
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt)
 
 @router.get("/transactions/past-6-months", response_model=list[TransactionPublic])
-def get_transactions_past_6_months(
-    db: Annotated[Session, Depends(get_session)]
+async def get_transactions_past_6_months(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     today = date.today()
     first_day = (today.replace(day=1) - relativedelta(months=5))
     next_month = (today.replace(day=1) + relativedelta(months=1))
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.date))
-    )
-    return db.exec(stmt).all()
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt)
 
 @router.get("/transactions/past-12-months", response_model=list[TransactionPublic])
-def get_transactions_past_12_months(
-    db: Annotated[Session, Depends(get_session)]
+async def get_transactions_past_12_months(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     today = date.today()
     first_day = (today.replace(day=1) - relativedelta(months=11))
     next_month = (today.replace(day=1) + relativedelta(months=1))
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.date))
-    )
-    return db.exec(stmt).all()
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt)
 
 @router.get("/transactions/year-to-date", response_model=list[TransactionPublic])
-def get_transactions_ytd(
-    db: Annotated[Session, Depends(get_session)]
+async def get_transactions_ytd(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     today = date.today()
     first_day = date(today.year, 1, 1)
     next_month = (today.replace(day=1) + relativedelta(months=1))
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.created_date))
-    )
-    results = db.exec(stmt).all()
-    return results
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt)
 
 @router.get("/transactions/to-date", response_model=list[TransactionPublic])
-def get_transactions_to_date(
-    db: Annotated[Session, Depends(get_session)]
+async def get_transactions_to_date(
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     today = date.today()
     next_month = (today.replace(day=1) + relativedelta(months=1))
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.created_date))
-    )
-    results = db.exec(stmt).all()
-    return results
+    stmt = date_range_statement(None, next_month)
+    return stream_transactions(db, stmt)
 
 @router.get("/transactions/range/{from_year}-{from_month}/{to_year}-{to_month}", response_model=list[TransactionPublic])
-def get_transactions_by_range(
+async def get_transactions_by_range(
     from_year: Annotated[int, Path(..., ge=1, le=9999)],
     from_month: Annotated[int, Path(..., ge=1, le=12)],
     to_year: Annotated[int, Path(..., ge=1, le=9999)],
     to_month: Annotated[int, Path(..., ge=1, le=12)],
-    db: Annotated[Session, Depends(get_session)]
+    db: Annotated[AsyncSession, Depends(get_async_session)]
 ):
     first_day = date(from_year, from_month, 1)
     next_month = date(to_year + (to_month // 12), (to_month % 12) + 1, 1)
 
-    stmt = (
-        select(Transaction)
-        .where(Transaction.date >= first_day)
-        .where(Transaction.date < next_month)
-        .order_by(desc(Transaction.created_date))
-    )
-    results = db.exec(stmt).all()
-    return results
+    stmt = date_range_statement(first_day, next_month)
+    return stream_transactions(db, stmt)
 
 @router.post("/transactions", response_model=TransactionPublic)
 def create_transaction(
     transaction: TransactionCreate,
     db: Annotated[Session, Depends(get_session)]
 ):
-    new_transaction = Transaction.model_validate(transaction)
+    exponent = get_settings().AMOUNT_EXPONENT
+    new_transaction = Transaction.model_validate(transaction, update={"amount": parse_amount(transaction.amount, exponent)})
     db.add(new_transaction)
-    db.commit()
+    commit_amounts(db, exponent)
     db.refresh(new_transaction)
-    return new_transaction
+    return to_public(new_transaction)
 
 @router.put("/transactions/{transaction_id}", response_model=TransactionPublic)
 def update_transaction(
@@ -201,10 +374,14 @@ def update_transaction(
     db_transaction = db.get(Transaction, transaction_id)
     if not db_transaction:
         raise HTTPException(status_code=404, detail="This transaction does not exist")
-    db_transaction.sqlmodel_update(transaction.model_dump(exclude_unset=True))
-    db.commit()
+    exponent = get_settings().AMOUNT_EXPONENT
+    values = transaction.model_dump(exclude_unset=True)
+    if values.get("amount") is not None:
+        values["amount"] = parse_amount(values["amount"], exponent)
+    db_transaction.sqlmodel_update(values)
+    commit_amounts(db, exponent)
     db.refresh(db_transaction)
-    return db_transaction
+    return to_public(db_transaction)
 
 @router.delete("/transactions/{transaction_id}")
 def delete_transaction(
@@ -218,17 +395,129 @@ def delete_transaction(
     db.commit()
     return {"ok": True}
 
+def insert_transactions(
+    rows: Iterable[TransactionCreate | dict],
+    db: Session,
+    skip_invalid: bool = False,
+):
+    """Validate rows one by one (unless already validated) and insert them in batched executemany statements. Nothing is committed when a row is invalid unless skip_invalid is set."""
+    exponent = get_settings().AMOUNT_EXPONENT
+    inserted = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            transaction = row if isinstance(row, TransactionCreate) else TransactionCreate.model_validate(row)
+            amount = to_minor_units(transaction.amount, exponent)
+        except ValidationError as e:
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                error = e.errors()[0]
+                field = ".".join(str(loc) for loc in error["loc"])
+                errors.append({"row": number, "error": f"{field}: {error['msg']}" if field else error["msg"]})
+            continue
+        except ValueError as e:
+            # Too many decimals (or digits) for the stored amounts
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"row": number, "error": str(e)})
+            continue
+
+        # Once a row failed nothing is committed, so the remaining rows are only validated for the report
+        if failed and not skip_invalid:
+            batch = []
+            continue
+
+        batch.append({
+            **transaction.model_dump(),
+            "amount": amount,
+            "id": uuid4(),
+            "recurringID": "",
+            "created_date": datetime.now(),
+        })
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            db.exec(insert(Transaction), params=batch)
+            inserted += len(batch)
+            batch = []
+
+    if batch:
+        db.exec(insert(Transaction), params=batch)
+        inserted += len(batch)
+
+    if failed and not skip_invalid:
+        db.rollback()
+        inserted = 0
+    else:
+        commit_amounts(db, exponent)
+
+    return {"ok": not failed, "inserted": inserted, "failed": failed, "errors": errors}
+
+def read_csv_rows(file: io.TextIOBase):
+    reader = csv.DictReader(file)
+    missing = [c for c in EXPORT_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing CSV columns: {', '.join(missing)}")
+    for row in reader:
+        row["tags"] = csv_cell_to_tags(row["tags"])
+        yield row
+
+def read_ndjson_rows(file: io.TextIOBase):
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Let validation report the row
+            yield None
+
 @router.post("/transactions/import")
 def import_transactions(
-    transactions: list[TransactionCreate],
-    db: Annotated[Session, Depends(get_session)]
+    # Invalid rows are kept as they are (and left out of the schema), to be reported or skipped row by row
+    transactions: list[Annotated[TransactionCreate | SkipJsonSchema[dict], Field(union_mode="left_to_right")]],
+    db: Annotated[Session, Depends(get_session)],
+    skip_invalid: bool = False,
 ):
+    """Import a JSON list of transactions. Returns inserted/failed counts, and with skip_invalid the errors of the skipped rows."""
     if not transactions:
         raise HTTPException(status_code=400, detail="No transactions to import")
 
-    for transaction in transactions:
-        new_transaction = Transaction.model_validate(transaction)
-        db.add(new_transaction)
+    if not skip_invalid:
+        errors = []
+        for index, row in enumerate(transactions):
+            if isinstance(row, TransactionCreate):
+                continue
+            try:
+                TransactionCreate.model_validate(row)
+            except ValidationError as e:
+                errors.extend({**error, "loc": ("body", index, *error["loc"])} for error in e.errors(include_url=False))
+        if errors:
+            raise RequestValidationError(errors)
+    return insert_transactions(transactions, db, skip_invalid)
 
-    db.commit()
-    return {"ok": True}
+@router.post("/transactions/import/file")
+def import_transactions_file(
+    file: UploadFile,
+    db: Annotated[Session, Depends(get_session)],
+    format: Literal["csv", "ndjson"] | None = None,
+    skip_invalid: bool = False,
+):
+    """Import a CSV (export column layout) or NDJSON upload, parsed as a stream. Returns inserted/failed counts and per-row errors."""
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+    content = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        rows = read_csv_rows(content) if format == "csv" else read_ndjson_rows(content)
+        result = insert_transactions(rows, db, skip_invalid)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="The file must be UTF-8 encoded")
+    finally:
+        content.detach()
+
+    if not result["inserted"] and not result["failed"]:
+        raise HTTPException(status_code=400, detail="No transactions to import")
+    return result
@@ -0,0 +1,39 @@
+import threading
+from sqlmodel import Session, select
+
+from .caching import CONFIG_VERSION
+from .database import engine
+from .models.app import AppConfig, Settings
+
+class SettingsCache:
+    """In-process cache of the AppConfig table, reloaded when the version file changes."""
+
+    def __init__(self):
+        self._settings = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Settings:
+        version = CONFIG_VERSION.version()
+        with self._lock:
+            if self._settings is None or version != self._version:
+                # Read the version before the rows, so a concurrent write triggers another reload
+                with Session(engine) as db:
+                    rows = db.exec(select(AppConfig)).all()
+                self._settings = Settings(**{row.key: row.value for row in rows})
+                self._version = version
+            return self._settings
+
+    def invalidate(self):
+        # Replaced on every AppConfig write so all workers drop their cached settings
+        CONFIG_VERSION.bump()
+        with self._lock:
+            self._settings = None
+
+settings_cache = SettingsCache()
+
+def get_settings() -> Settings:
+    return settings_cache.get()
+
+def invalidate_settings():
+    settings_cache.invalidate()
@@ -0,0 +1,66 @@
+"""EXPLAIN QUERY PLAN regression tests: each endpoint query must search the index matching its shape, without sorting its rows."""
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import create_engine
+
+from api.migrations import create_schema
+from api.models.analytics import MonthlySummary, MonthlyTagSummary
+from api.models.transactions import Transaction
+from api.routers.analytics import summary_statement
+from api.routers.categories import count_category, rename_category
+from api.routers.recurring_transactions import delete_occurrences_statement, recurring_transactions_statement, update_occurrences_statement
+from api.routers.tags import replace_tag
+from api.routers.transactions import after_cursor, date_range_statement, name_suggestion_statements, search_statement, transactions_statement
+
+FIRST_DAY = date(2025, 1, 1)
+NEXT_MONTH = date(2025, 2, 1)
+RECURRING_ID = uuid4()
+
+prefix_names, contained_names = name_suggestion_statements("cof", FIRST_DAY)
+
+# (statement, index it must use), built by the same functions as the endpoints
+STATEMENTS = {
+    "listing": (transactions_statement(), "ix_transaction_created_date_id"),
+    "pagination": (after_cursor(transactions_statement(), datetime(2025, 1, 1), uuid4()).limit(51), "ix_transaction_created_date_id"),
+    "tag filter": (transactions_statement(tag="food"), "sqlite_autoindex_transaction_tags_1"),
+    "search": (search_statement("cof*", 2), "transaction_fts VIRTUAL TABLE"),
+    "name prefix": (prefix_names.limit(10), "ix_transaction_names_count_name"),
+    "name contains": (contained_names.limit(10), "ix_transaction_names_count_name"),
+    "month": (date_range_statement(FIRST_DAY, NEXT_MONTH), "ix_transaction_date_created_date"),
+    "to date": (date_range_statement(None, NEXT_MONTH), "ix_transaction_date_created_date"),
+    "category summary": (summary_statement(MonthlySummary, "2025-01", "2025-12"), "sqlite_autoindex_monthly_summary_1"),
+    "tag summary": (summary_statement(MonthlyTagSummary, "2025-01", "2025-12"), "sqlite_autoindex_monthly_tag_summary_1"),
+    "category count": (count_category(Transaction, "food"), "ix_transaction_category"),
+    "category rename": (rename_category(Transaction, "food", "groceries"), "ix_transaction_category"),
+    "tag rename": (replace_tag(Transaction, "food", "groceries"), "sqlite_autoindex_transaction_tags_1"),
+    "recurring": (recurring_transactions_statement(), "ix_recurringtransaction_created_date"),
+    "recurring update (future)": (update_occurrences_statement(RECURRING_ID, "future", {"name": "name"}), "ix_transaction_recurringID_date"),
+    "recurring delete (all)": (delete_occurrences_statement(RECURRING_ID, "all"), "ix_transaction_recurringID_date"),
+}
+
+# Queries that look up the matching ids through another index first, then sort only the matches
+SORTS_MATCHES = {"tag filter", "search"}
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'wally.db'}")
+    with engine.begin() as conn:
+        create_schema(conn)
+    return engine
+
+def query_plan(engine, statement) -> list[str]:
+    with engine.connect() as conn:
+        # Explain the statement as SQLAlchemy sends it, parameters included
+        event.listen(conn, "before_cursor_execute", lambda conn, cursor, sql, parameters, context, executemany: (f"EXPLAIN QUERY PLAN {sql}", parameters), retval=True)
+        return [detail for _, _, _, detail in conn.execute(statement).cursor.fetchall()]
+
+@pytest.mark.parametrize("name", STATEMENTS)
+def test_query_plan(engine, name):
+    statement, index = STATEMENTS[name]
+    plan = query_plan(engine, statement)
+    assert any(index in step for step in plan), plan
+    if name not in SORTS_MATCHES:
+        assert not any("USE TEMP B-TREE" in step for step in plan), plan
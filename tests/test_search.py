@@ -0,0 +1,46 @@
+"""Full-text search over transactions, through the search_statement of GET /transactions/search."""
+from datetime import date
+
+import pytest
+from sqlmodel import Session, create_engine, select
+
+from api.migrations import create_schema, rebuild_search_index
+from api.models.transactions import Transaction
+from api.routers.transactions import search_statement
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # Commits bump data/data.version, relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    engine = create_engine(f"sqlite:///{tmp_path / 'wally.db'}")
+    with engine.begin() as conn:
+        create_schema(conn)
+    with Session(engine) as db:
+        db.add(Transaction(name="Espresso", category="food", tags=["café", "日本"], amount=250, type="expense", date=date(2025, 1, 1)))
+        db.add(Transaction(name="Rent", category="home", tags=["monthly"], amount=70000, type="expense", date=date(2025, 1, 1)))
+        db.commit()
+    return engine
+
+def search(engine, q: str) -> list[str]:
+    with engine.connect() as conn:
+        return [row.name for row in conn.execute(search_statement(q, 2))]
+
+@pytest.mark.parametrize("q", ["café", "caf*", "日本", "tags:café"])
+def test_non_ascii_tags(engine, q):
+    assert search(engine, q) == ["Espresso"]
+
+def test_escaped_tags_are_not_indexed(engine):
+    assert search(engine, "u00e9") == []
+
+def test_updated_and_rebuilt_tags(engine):
+    with Session(engine) as db:
+        rent = db.exec(select(Transaction).where(Transaction.name == "Rent")).one()
+        rent.tags = ["maison", "été"]
+        db.commit()
+    assert search(engine, "été") == ["Rent"]
+    assert search(engine, "monthly") == []
+
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    assert search(engine, "été") == ["Rent"]
+    assert search(engine, "café") == ["Espresso"]
@@ -0,0 +1,317 @@
+"""
+Benchmark the Wally API against a generated dataset.
+
+Creates a database with `python -m api.demo` in a temporary directory, starts the API
+(uvicorn, single process) on it and measures:
+- latency percentiles (p50 / p95 / p99) of every endpoint
+- rows/sec of CSV import and export
+- peak RSS of the API process
+
+Results can be saved as JSON and compared with a previous run, e.g. from another commit:
+
+Usage:
+  python3 utils/benchmark.py [--transactions 100000] [--recurring 50] [--tags 20] [--requests 50] [--output results.json] [--compare baseline.json]
+"""
+
+import os
+import io
+import csv
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import date
+import httpx
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "benchmark"
+
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def peak_rss_mb(pid):
+    """Peak resident set size of a running process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        return None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def generate_dataset(workdir, args):
+    env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+    command = [sys.executable, "-m", "api.demo", "--transactions", str(args.transactions), "--recurring", str(args.recurring), "--tags", str(args.tags), "--seed", "1"]
+    started = time.perf_counter()
+    subprocess.run(command, cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def start_api(workdir, port):
+    env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+    env.pop("DEMO", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    for _ in range(600):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    process.kill()
+    raise Exception("The API did not start")
+
+
+def measure(client, name, method, url, n, results, **kwargs):
+    """Send the request n times (after one warm-up request) and record its latencies in ms."""
+    response = client.request(method, url, **kwargs)
+    if response.status_code >= 400:
+        raise Exception(f"{name}: {response.status_code} {response.text[:200]}")
+
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    results[name] = {
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": sum(samples) / len(samples),
+        "bytes": len(response.content),
+    }
+    print(f"{name:<55} p50 {results[name]['p50']:8.2f} ms   p95 {results[name]['p95']:8.2f} ms   p99 {results[name]['p99']:8.2f} ms")
+
+
+def measure_each(client, name, n, results, send):
+    """Like measure(), for requests that change on every call (send(i) performs request i)."""
+    samples = []
+    for i in range(n):
+        started = time.perf_counter()
+        response = send(i)
+        samples.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise Exception(f"{name}: {response.status_code} {response.text[:200]}")
+
+    results[name] = {
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": sum(samples) / len(samples),
+    }
+    print(f"{name:<55} p50 {results[name]['p50']:8.2f} ms   p95 {results[name]['p95']:8.2f} ms   p99 {results[name]['p99']:8.2f} ms")
+
+
+def benchmark_reads(client, n, results):
+    today = date.today()
+    month = f"{today.year}-{today.month:02d}"
+    transaction_id = client.get("/transactions", params={"limit": 1}).json()[0]["id"]
+    recurring = client.get("/recurring").json()
+
+    measure(client, "GET /transactions (limit 100)", "GET", "/transactions", n, results, params={"limit": 100})
+    measure(client, "GET /transactions (limit 1000)", "GET", "/transactions", n, results, params={"limit": 1000})
+    etag = client.get("/transactions", params={"limit": 1000}).headers.get("etag")
+    if etag:
+        measure(client, "GET /transactions (limit 1000, 304)", "GET", "/transactions", n, results, params={"limit": 1000}, headers={"If-None-Match": etag})
+    measure(client, "GET /transactions (category filter, limit 100)", "GET", "/transactions", n, results, params={"limit": 100, "category": "Food"})
+    measure(client, "GET /transactions/search", "GET", "/transactions/search", n, results, params={"q": "groc*"})
+    measure(client, "GET /transactions/id/{id}", "GET", f"/transactions/id/{transaction_id}", n, results)
+    measure(client, "GET /transactions/names/search", "GET", "/transactions/names/search", n, results, params={"q": "foo"})
+    measure(client, "GET /transactions/date/{year}-{month}", "GET", f"/transactions/date/{month}", n, results)
+    measure(client, "GET /transactions/past-3-months", "GET", "/transactions/past-3-months", n, results)
+    measure(client, "GET /transactions/past-6-months", "GET", "/transactions/past-6-months", n, results)
+    measure(client, "GET /transactions/past-12-months", "GET", "/transactions/past-12-months", n, results)
+    measure(client, "GET /transactions/year-to-date", "GET", "/transactions/year-to-date", n, results)
+    measure(client, "GET /transactions/to-date", "GET", "/transactions/to-date", max(1, n // 10), results)
+    measure(client, "GET /transactions/range/{from}/{to}", "GET", f"/transactions/range/{today.year - 1}-01/{today.year - 1}-12", n, results)
+    measure(client, "GET /analytics/summary (12 months)", "GET", "/analytics/summary", n, results, params={"start": f"{today.year - 1}-{today.month:02d}", "end": month})
+    measure(client, "GET /analytics/summary (all)", "GET", "/analytics/summary", n, results)
+    measure(client, "GET /recurring", "GET", "/recurring", n, results)
+    if recurring:
+        measure(client, "GET /recurring/{id}", "GET", f"/recurring/{recurring[0]['id']}", n, results)
+    measure(client, "GET /categories", "GET", "/categories", n, results)
+    measure(client, "GET /tags", "GET", "/tags", n, results)
+    measure(client, "GET /currency", "GET", "/currency", n, results)
+    measure(client, "GET /language", "GET", "/language", n, results)
+    measure(client, "GET /login/check", "GET", "/login/check", n, results)
+    measure(client, "GET /api-keys", "GET", "/api-keys", n, results)
+    measure(client, "GET /health", "GET", "/health", n, results)
+
+
+def benchmark_writes(client, n, results):
+    today = date.today().isoformat()
+    created = []
+
+    def create_transaction(i):
+        response = client.post("/transactions", json={"name": f"Benchmark {i}", "category": "Food", "tags": ["benchmark"], "amount": "12.34", "date": today})
+        created.append(response.json().get("id"))
+        return response
+
+    measure_each(client, "POST /transactions", n, results, create_transaction)
+    measure_each(client, "PUT /transactions/{id}", n, results, lambda i: client.put(f"/transactions/{created[i]}", json={"amount": "43.21"}))
+    measure_each(client, "DELETE /transactions/{id}", n, results, lambda i: client.delete(f"/transactions/{created[i]}"))
+
+    recurring = []
+    recurring_runs = max(1, n // 5)
+
+    def create_recurring(i):
+        response = client.post("/recurring", json={"name": f"Benchmark {i}", "category": "Rent", "amount": "500", "startDate": f"{date.today().year - 1}-01-01", "endDate": f"{date.today().year + 1}-12-31", "frequency": "weekly"})
+        recurring.append(response.json().get("id"))
+        return response
+
+    measure_each(client, "POST /recurring (weekly, 3 years)", recurring_runs, results, create_recurring)
+    measure_each(client, "PUT /recurring/{id} (all occurrences)", recurring_runs, results, lambda i: client.put(f"/recurring/{recurring[i]}", json={"amount": "550", "applyTo": "all"}))
+    measure_each(client, "DELETE /recurring/{id} (all occurrences)", recurring_runs, results, lambda i: client.request("DELETE", f"/recurring/{recurring[i]}", json={"applyTo": "all"}))
+
+    measure_each(client, "POST /categories", n, results, lambda i: client.post("/categories", json={"name": f"Benchmark {i}"}))
+    measure_each(client, "PUT /categories/{name} (rename)", n, results, lambda i: client.put(f"/categories/Benchmark {i}", json={"name": f"Benchmarked {i}"}))
+    measure_each(client, "DELETE /categories/{name}", n, results, lambda i: client.delete(f"/categories/Benchmarked {i}"))
+    measure_each(client, "PUT /categories/{name} (rename, used)", 2, results, lambda i: client.put("/categories/Food" if i == 0 else "/categories/Meals", json={"name": "Meals" if i == 0 else "Food"}))
+
+    measure_each(client, "POST /tags", n, results, lambda i: client.post("/tags", json={"name": f"benchmark-{i}"}))
+    measure_each(client, "PUT /tags/{name} (rename)", n, results, lambda i: client.put(f"/tags/benchmark-{i}", json={"name": f"benchmarked-{i}"}))
+    measure_each(client, "DELETE /tags/{name}", n, results, lambda i: client.delete(f"/tags/benchmarked-{i}"))
+
+    measure_each(client, "PUT /currency/{name}", n, results, lambda i: client.put(f"/currency/{'USD' if i % 2 else 'EUR'}"))
+    measure_each(client, "PUT /language/{language}", n, results, lambda i: client.put("/language/en"))
+
+
+def benchmark_auth(client, n, results):
+    """Latency with login enabled: password login (bcrypt), cookie and API key authentication."""
+    client.post("/login/password", json={"password": PASSWORD})
+    try:
+        measure_each(client, "POST /login", max(1, n // 5), results, lambda i: client.post("/login", json={"password": PASSWORD}))
+        measure(client, "GET /categories (cookie)", "GET", "/categories", n, results)
+        api_key = client.post("/api-keys").json()
+        with httpx.Client(base_url=client.base_url) as key_client:
+            measure(key_client, "GET /categories (API key)", "GET", "/categories", n, results, headers={"X-API-Key": api_key["key"]})
+        client.delete(f"/api-keys/{api_key['id']}")
+    finally:
+        client.post("/login/password", json={"password": None})
+
+
+def benchmark_import_export(client, rows, results):
+    # Export
+    started = time.perf_counter()
+    exported = 0
+    with client.stream("GET", "/transactions/export", params={"format": "csv"}) as response:
+        for _ in response.iter_lines():
+            exported += 1
+    exported -= 1  # header
+    elapsed = time.perf_counter() - started
+    results["export_rows"] = exported
+    results["export_rows_per_sec"] = exported / elapsed
+    print(f"{'Export (CSV)':<55} {exported} rows in {elapsed:.2f} s ({exported / elapsed:,.0f} rows/s)")
+
+    # Import
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["name", "category", "type", "amount", "date", "tags"])
+    for i in range(rows):
+        writer.writerow([f"Imported {i}", "Groceries", "expense", "12.34", date.today().isoformat(), "imported,benchmark"])
+    started = time.perf_counter()
+    response = client.post("/transactions/import/file", params={"format": "csv"}, files={"file": ("import.csv", buffer.getvalue().encode())})
+    elapsed = time.perf_counter() - started
+    if not response.json().get("ok"):
+        raise Exception(f"Import failed: {response.text[:200]}")
+    results["import_rows"] = rows
+    results["import_rows_per_sec"] = rows / elapsed
+    print(f"{'Import (CSV)':<55} {rows} rows in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s)")
+
+
+def compare(results, baseline):
+    """Print the change of every metric against a previous run."""
+    print(f"\nComparison with {baseline.get('commit') or 'baseline'}:")
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous:
+            change = (current["p50"] - previous["p50"]) / previous["p50"] * 100
+            print(f"{name:<55} p50 {previous['p50']:8.2f} -> {current['p50']:8.2f} ms ({change:+.0f}%)")
+    for key in ["import_rows_per_sec", "export_rows_per_sec", "peak_rss_mb"]:
+        if results.get(key) and baseline.get(key):
+            change = (results[key] - baseline[key]) / baseline[key] * 100
+            print(f"{key:<55} {baseline[key]:10.1f} -> {results[key]:10.1f} ({change:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wally API against a generated dataset.")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Transactions in the dataset (default: 100000)")
+    parser.add_argument("--recurring", type=int, default=50, help="Recurring transactions in the dataset (default: 50)")
+    parser.add_argument("--tags", type=int, default=20, help="Tags in the dataset (default: 20)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint (default: 50)")
+    parser.add_argument("--import-rows", type=int, default=20_000, help="Rows in the imported CSV file (default: 20000)")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results saved by a previous run")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary directory with the database")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="wally-benchmark-")
+    process = None
+    try:
+        print(f"Generating {args.transactions} transactions in {workdir} ...")
+        generation_seconds = generate_dataset(workdir, args)
+
+        port = free_port()
+        process = start_api(workdir, port)
+        endpoints = {}
+        results = {
+            "commit": git_commit(),
+            "dataset": {"transactions": args.transactions, "recurring": args.recurring, "tags": args.tags},
+            "generation_seconds": generation_seconds,
+            "endpoints": endpoints,
+        }
+
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+            benchmark_reads(client, args.requests, endpoints)
+            benchmark_writes(client, max(1, args.requests // 2), endpoints)
+            benchmark_auth(client, args.requests, endpoints)
+            benchmark_import_export(client, args.import_rows, results)
+
+        results["peak_rss_mb"] = peak_rss_mb(process.pid)
+        if results["peak_rss_mb"]:
+            print(f"{'Peak RSS':<55} {results['peak_rss_mb']:.1f} MB")
+
+        if args.output:
+            Path(args.output).write_text(json.dumps(results, indent=2))
+            print(f"\nResults saved to {args.output}")
+        if args.compare:
+            compare(results, json.loads(Path(args.compare).read_text()))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        if args.keep:
+            print(f"Database kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -120,36 +120,28 @@ async function getCurrency() {
   };
 }
 
-async function getTransactions() {
-  let endpoint;
+// Totals come pre-grouped by month from the API, so the dashboard never
+// downloads individual transactions.
+async function getSummary() {
+  let months;
   if (chartSelected == 'currentMonth') {
     const month = String(currentDate.getMonth() + 1).padStart(2, '0');
     const year = currentDate.getFullYear();
-    endpoint = `${API_URL}/transactions/date/${year}-${month}`;
-  }
-  else if (chartSelected == 'lastThreeMonths') {
-    endpoint = `${API_URL}/transactions/past-3-months`;
-  }
-  else if (chartSelected == 'lastSixMonths') {
-    endpoint = `${API_URL}/transactions/past-6-months`;
-  }
-  else if (chartSelected == 'lastYear') {
-    endpoint = `${API_URL}/transactions/past-12-months`;
-  }
-  else if (chartSelected == 'yearToDate') {
-    endpoint = `${API_URL}/transactions/year-to-date`;
-  }
-  else if (chartSelected == 'customRange') {
-    const fromParts = window.customRangeFrom.split('-');
-    const toParts = window.customRangeTo.split('-');
-    endpoint = `${API_URL}/transactions/range/${fromParts[0]}-${fromParts[1]}/${toParts[0]}-${toParts[1]}`;
-  }
-  else if (chartSelected == 'allData') {
-    endpoint = `${API_URL}/transactions/to-date`;
+    months = [`${year}-${month}`];
   }
+  else if (chartSelected == 'lastThreeMonths') months = getLastNMonths(3);
+  else if (chartSelected == 'lastSixMonths') months = getLastNMonths(6);
+  else if (chartSelected == 'lastYear') months = getLastNMonths(12);
+  else if (chartSelected == 'yearToDate') months = getYearToDate();
+  else if (chartSelected == 'customRange') months = [window.customRangeFrom, window.customRangeTo];
+  else if (chartSelected == 'allData') months = [null, getLastNMonths(1)[0]];
+
+  const params = new URLSearchParams();
+  if (months[0]) params.set('start', months[0]);
+  params.set('end', months[months.length - 1]);
 
   try {
-    const response = await fetch(endpoint, {
+    const response = await fetch(`${API_URL}/analytics/summary?${params}`, {
       method: 'GET',
       credentials: 'include',
     });
@@ -207,12 +199,12 @@ document.getElementById('nextMonth').addEventListener('click', () => {
 });
 
 async function loadChart() {
-  const transactions = await getTransactions();
+  const summary = await getSummary();
   const chartBox = document.querySelector('.chart-box');
   const legendBox = document.getElementById('customLegend');
   const cashflowSection = document.getElementById('cashflow-section');
   const noDataMessage = document.getElementById('noDataMessage');
-  const hasExpenses = transactions.some(t => t.type === 'expense');
+  const hasExpenses = summary.categories.some(t => t.type === 'expense');
 
   if (!hasExpenses) {
     chartBox.style.display = 'none';
@@ -226,16 +218,16 @@ async function loadChart() {
     cashflowSection.style.display = 'flex';
     noDataMessage.style.display = 'none';
 
-    const data = calculateBreakdown(transactions);
+    const data = calculateBreakdown(summary);
     updateChart(data);
-    updateLegend(transactions, data);
-    updateCashflow(transactions);
+    updateLegend(summary, data);
+    updateCashflow(summary);
   }
 }
 
-function updateCashflow(transactions) {
-  const income = transactions.filter(t => t.type === 'income').reduce((acc, t) => Decimal.add(acc, t.amount).toNumber(), 0);
-  const expense = transactions.filter(t => t.type === 'expense').reduce((acc, t) => Decimal.add(acc, t.amount).toNumber(), 0);
+function updateCashflow(summary) {
+  const income = summary.categories.filter(t => t.type === 'income').reduce((acc, t) => Decimal.add(acc, t.total).toNumber(), 0);
+  const expense = summary.categories.filter(t => t.type === 'expense').reduce((acc, t) => Decimal.add(acc, t.total).toNumber(), 0);
   const balance = Decimal.sub(income, expense);
 
   document.getElementById('cashflow-income').textContent = formatCurrency(income);
@@ -448,30 +440,27 @@ function updateChart(data) {
   }
 }
 
-function calculateBreakdown(transactions) {
+function calculateBreakdown(summary) {
   const breakdownMap = {};
   const untaggedLabel = i18n.t('dashboard.group_by.untagged');
 
-  for (const { type, amount, date, category, tags: txTags } of transactions) {
-    if (type !== 'expense') continue;
-
-    const monthKey = date.slice(0, 7); // YYYY-MM
-
-    if (chartGroupBy === 'tags') {
-      const groupKeys = txTags && txTags.length > 0 ? txTags : [untaggedLabel];
-      const share = Decimal.div(amount, groupKeys.length).toNumber();
-      for (const groupValue of groupKeys) {
-        if (chartDisabledFields.has(groupValue)) continue;
-        if (!breakdownMap[groupValue]) breakdownMap[groupValue] = { total: 0, months: {} };
-        breakdownMap[groupValue].total = Decimal.add(breakdownMap[groupValue].total, share).toNumber();
-        breakdownMap[groupValue].months[monthKey] = Decimal.add((breakdownMap[groupValue].months[monthKey] || 0), share).toNumber();
-      }
-    } else {
-      const groupValue = category;
+  if (chartGroupBy === 'tags') {
+    // Each tag gets its share of the amounts, split evenly across the tags of every transaction
+    for (const { type, share, month: monthKey, tag } of summary.tags) {
+      if (type !== 'expense') continue;
+      const groupValue = tag ?? untaggedLabel;
+      if (chartDisabledFields.has(groupValue)) continue;
+      if (!breakdownMap[groupValue]) breakdownMap[groupValue] = { total: 0, months: {} };
+      breakdownMap[groupValue].total = Decimal.add(breakdownMap[groupValue].total, share).toNumber();
+      breakdownMap[groupValue].months[monthKey] = Decimal.add((breakdownMap[groupValue].months[monthKey] || 0), share).toNumber();
+    }
+  } else {
+    for (const { type, total, month: monthKey, category: groupValue } of summary.categories) {
+      if (type !== 'expense') continue;
       if (chartDisabledFields.has(groupValue)) continue;
       if (!breakdownMap[groupValue]) breakdownMap[groupValue] = { total: 0, months: {} };
-      breakdownMap[groupValue].total = Decimal.add(breakdownMap[groupValue].total, amount).toNumber();
-      breakdownMap[groupValue].months[monthKey] = Decimal.add((breakdownMap[groupValue].months[monthKey] || 0), amount).toNumber();
+      breakdownMap[groupValue].total = Decimal.add(breakdownMap[groupValue].total, total).toNumber();
+      breakdownMap[groupValue].months[monthKey] = Decimal.add((breakdownMap[groupValue].months[monthKey] || 0), total).toNumber();
     }
   }
 
@@ -496,24 +485,21 @@ function calculateBreakdown(transactions) {
   }));
 }
 
-function updateLegend(transactions, data) {
+function updateLegend(summary, data) {
   const legendContainer = document.getElementById('customLegend');
   legendContainer.innerHTML = '';
 
-  const monthExpenses = transactions.filter(t => t.type === 'expense');
   const labelMap = new Map(data.map(x => [x.name, x]));
   const untaggedLabel = i18n.t('dashboard.group_by.untagged');
 
   // Collect unique labels based on groupBy
   let uniqueLabels;
+  let monthExpenses;
   if (chartGroupBy === 'tags') {
-    const labelSet = new Set();
-    monthExpenses.forEach(exp => {
-      if (exp.tags && exp.tags.length > 0) exp.tags.forEach(t => labelSet.add(t));
-      else labelSet.add(untaggedLabel);
-    });
-    uniqueLabels = Array.from(labelSet);
+    monthExpenses = summary.tags.filter(t => t.type === 'expense');
+    uniqueLabels = Array.from(new Set(monthExpenses.map(exp => exp.tag ?? untaggedLabel)));
   } else {
+    monthExpenses = summary.categories.filter(t => t.type === 'expense');
     uniqueLabels = monthExpenses.map(exp => exp.category).filter((v, i, a) => a.indexOf(v) === i);
   }
 
@@ -546,17 +532,14 @@ function updateLegend(transactions, data) {
   // Calculate active total — always the real expense sum (never inflated)
   let activeTotal;
   if (chartGroupBy === 'tags') {
-    // Only count transactions whose tags are not ALL disabled
-    activeTotal = monthExpenses
-    .filter(tx => {
-      const keys = tx.tags && tx.tags.length > 0 ? tx.tags : [untaggedLabel];
-      return keys.some(t => !chartDisabledFields.has(t));
-    })
-    .reduce((sum, x) => Decimal.add(sum, x.amount).toNumber(), 0);
+    // The shares of the enabled tags, or the exact expense total when every tag is enabled
+    activeTotal = chartDisabledFields.size > 0
+      ? monthExpenses.filter(x => !chartDisabledFields.has(x.tag ?? untaggedLabel)).reduce((sum, x) => Decimal.add(sum, x.share).toNumber(), 0)
+      : summary.categories.filter(x => x.type === 'expense').reduce((sum, x) => Decimal.add(sum, x.total).toNumber(), 0);
   } else {
     activeTotal = monthExpenses
     .filter(x => !chartDisabledFields.has(x.category))
-    .reduce((sum, x) => Decimal.add(sum, x.amount).toNumber(), 0);
+    .reduce((sum, x) => Decimal.add(sum, x.total).toNumber(), 0);
   }
 
   legendContainer.insertAdjacentHTML('beforeend', `
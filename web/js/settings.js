@@ -659,12 +659,13 @@ async function changeCurrency(event) {
 
     if (!response.ok) {
       if (response.status === 422) throw new Error(json.detail[0].msg)
-      else if ([400, 404].includes(response.status)) throw new Error(json.detail)
+      else if ([400, 404, 409].includes(response.status)) throw new Error(json.detail)
       throw new Error("An error occurred.")
     }
     else {
-      // Show toast
-      bootstrap.showToast({body: i18n.t('settings.messages.currency_changed'), delay: 1000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-success"})
+      // Show toast (saying how many amounts were rounded to the new decimals, if any)
+      if (json.rounded) bootstrap.showToast({body: i18n.t('settings.messages.currency_rounded').replace('{count}', json.rounded), delay: 4000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-warning"})
+      else bootstrap.showToast({body: i18n.t('settings.messages.currency_changed'), delay: 1000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-success"})
 
       // Refresh the currency
       currency = await getCurrency();
@@ -673,12 +674,15 @@ async function changeCurrency(event) {
       const currencyData = await fetch(`${API_URL}/currency`, {credentials: 'include'}).then(r => r.json());
       renderCurrency(currencyData);
 
-      // Update the grid with the new currency
-      gridApi.refreshCells();
+      // Reload the recurring transactions, their amounts are rescaled to the new decimals
+      await getRecurring();
     }
   }
   catch (error) {
     bootstrap.showToast({body: `${error}`, delay: 2000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-danger"})
+
+    // Select the current currency again
+    renderCurrency(await fetch(`${API_URL}/currency`, {credentials: 'include'}).then(r => r.json()));
   }
 }
 
@@ -873,13 +877,14 @@ async function editCurrencySubmit(event) {
     const json = await response.json();
     if (!response.ok) throw new Error(json.detail || 'Error updating currency');
 
-    bootstrap.showToast({body: i18n.t('settings.messages.currency_updated'), delay: 1000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-success"});
+    if (json.rounded) bootstrap.showToast({body: i18n.t('settings.messages.currency_rounded').replace('{count}', json.rounded), delay: 4000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-warning"});
+    else bootstrap.showToast({body: i18n.t('settings.messages.currency_updated'), delay: 1000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-success"});
     bootstrap.Modal.getInstance(document.getElementById('currencyEditModal')).hide();
     new bootstrap.Modal(document.getElementById('currencyModal')).show();
     await renderCurrencyList();
     currency = await getCurrency();
     renderCurrency(await fetch(`${API_URL}/currency`, {credentials: 'include'}).then(r => r.json()));
-    gridApi.refreshCells();
+    await getRecurring();
   } catch (error) {
     bootstrap.showToast({body: `${error}`, delay: 2000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-danger"});
   }
@@ -1312,32 +1317,15 @@ async function deleteApiKeySubmit(event) {
 // - IMPORT / EXPORT -
 // -------------------
 
-// Tags are stored as arrays internally but must fit in a single CSV cell.
-// We embed a "sub-CSV": the cell value is itself a comma-separated list where
-// each tag is CSV-quoted only if it contains a comma, quote, or newline. Using
-// Papa for both directions keeps the round-trip symmetric — a tag like
-// "Home, Office" survives export+import as a single tag instead of being
-// silently split.
-function tagsToCsvCell(tags) {
-  if (!Array.isArray(tags) || tags.length === 0) return '';
-  const normalized = tags.map(t => (t == null ? '' : String(t)));
-  return Papa.unparse([normalized], { header: false }).replace(/\r?\n$/, '');
-}
-
-function csvCellToTags(cell) {
-  if (cell == null) return [];
-  const str = String(cell).trim();
-  if (str === '') return [];
-  const { data } = Papa.parse(str, { header: false, skipEmptyLines: false });
-  const row = data?.[0];
-  if (!Array.isArray(row)) return [];
-  // Trim whitespace (forgiving for hand-edited CSVs) and drop empty entries.
-  return row.map(t => (t == null ? '' : String(t).trim())).filter(t => t !== '');
-}
+// CSV files are encoded and parsed by the API. Tags are stored as arrays
+// internally but must fit in a single CSV cell, so the cell value is itself a
+// comma-separated list where each tag is CSV-quoted only if it contains a
+// comma, quote, or newline — a tag like "Home, Office" survives export+import
+// as a single tag instead of being silently split.
 
 async function exportToCSV() {
   try {
-    const response = await fetch(`${API_URL}/transactions`, {
+    const response = await fetch(`${API_URL}/transactions?limit=1`, {
       method: 'GET',
       credentials: 'include',
     });
@@ -1360,19 +1348,9 @@ async function exportToCSV() {
         return;
       }
 
-      // Serialize each transaction's tag array into a single CSV cell value
-      // so tags containing commas/quotes survive the round-trip.
-      const rows = json.map(tx => ({ ...tx, tags: tagsToCsvCell(tx.tags) }));
-      const mandatoryColumns = ["name", "category", "tags", "amount", "type", "date"];
-      const csv = Papa.unparse(rows, {
-        columns: mandatoryColumns
-      });
-
-      // Create Blob and trigger download
-      const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
+      // The API streams the CSV straight to disk
       const link = document.createElement('a');
-      const url = URL.createObjectURL(blob);
-      link.setAttribute('href', url);
+      link.setAttribute('href', `${API_URL}/transactions/export?format=csv`);
       link.setAttribute('download', 'transactions.csv');
       link.style.visibility = 'hidden';
       document.body.appendChild(link);
@@ -1389,38 +1367,15 @@ async function importFromCSV() {
   const file = event.target.files[0];
   if (!file) return;
 
-  // Read file content
-  const csvText = await file.text();
+  // Upload the file as is, the API parses and validates it as a stream
+  const body = new FormData();
+  body.append('file', file);
 
-  // Parse CSV to JSON using PapaParse
-  const { data, errors, meta } = Papa.parse(csvText, {
-    header: true,
-    skipEmptyLines: true,
-    transform: (value, column) => {
-      if (column === "tags") return csvCellToTags(value);
-      return value;
-    }
-  });
-
-  // Check for missing mandatory columns
-  const mandatoryColumns = ["name", "category", "tags", "amount", "type", "date"];
-  const missing = mandatoryColumns.filter(col => !meta.fields.includes(col));
-  if (missing.length > 0) {
-    errors.unshift({message: `Missing CSV columns: ${missing.join(", ")}`});
-  }
-
-  if (errors.length) {
-    bootstrap.showToast({body: errors[0].message, delay: 3000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-danger"});
-    return;
-  }
-
-  // Send data
   try {
-    const response = await fetch(`${API_URL}/transactions/import`, {
+    const response = await fetch(`${API_URL}/transactions/import/file?format=csv`, {
       method: 'POST',
       credentials: 'include',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(data),
+      body,
     });
 
     if (response.status === 401) {
@@ -1435,6 +1390,10 @@ async function importFromCSV() {
       else if ([400, 404].includes(response.status)) throw new Error(json.detail)
       throw new Error("An error occurred.")
     }
+    else if (!json.ok) {
+      // Nothing is imported if a row is invalid, show the first error
+      throw new Error(`Row ${json.errors[0].row}: ${json.errors[0].error}`)
+    }
     else {
       // Show confirmation message
       bootstrap.showToast({body: i18n.t('settings.messages.transactions_imported'), delay: 1000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-success"})
@@ -1591,8 +1550,8 @@ async function initGrid() {
           const bData = nodeB.data;
 
           // Calculate "sort value" for aData.amount based on type
-          const aVal = (aData.type === 'expense' ? -aData.amount : aData.amount);
-          const bVal = (bData.type === 'expense' ? -bData.amount : bData.amount);
+          const aVal = (aData.type === 'expense' ? -aData.amount : Number(aData.amount));
+          const bVal = (bData.type === 'expense' ? -bData.amount : Number(bData.amount));
 
           // Normal numeric compare
           if (aVal < bVal) return -1;
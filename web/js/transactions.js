@@ -10,6 +10,11 @@ let gridApi;
 let modalMode = 'add';
 let selectedRow;
 
+const TRANSACTIONS_PAGE_SIZE = 500;
+let transactionsRequestId = 0;
+let searchTransactionsTimer;
+let loadedSearch = null;
+
 let currentDate = new Date();
 let tagsInput;
 let nameInput;
@@ -432,8 +437,8 @@ async function initGrid() {
           const bData = nodeB.data;
 
           // Calculate "sort value" for aData.amount based on type
-          const aVal = (aData.type === 'expense' ? -aData.amount : aData.amount);
-          const bVal = (bData.type === 'expense' ? -bData.amount : bData.amount);
+          const aVal = (aData.type === 'expense' ? -aData.amount : Number(aData.amount));
+          const bVal = (bData.type === 'expense' ? -bData.amount : Number(bData.amount));
 
           // Normal numeric compare
           if (aVal < bVal) return -1;
@@ -520,7 +525,25 @@ function renderMonth() {
 }
 
 function onFilterTextBoxChanged() {
-  gridApi.setGridOption("quickFilterText", document.getElementById("searchInput").value);
+  const text = document.getElementById("searchInput").value;
+  gridApi.setGridOption("quickFilterText", text);
+
+  // When showing all transactions, search on the server instead of downloading the whole ledger
+  if (document.getElementById('showAllTransactions').checked && toServerSearch(text) !== loadedSearch) {
+    clearTimeout(searchTransactionsTimer);
+    searchTransactionsTimer = setTimeout(getTransactions, 300);
+  }
+}
+
+function toServerSearch(text) {
+  // Amounts and dates (e.g. "3.50", "2025-01") aren't in the search index: for those, load every transaction and let the quick filter match them
+  const words = text.trim().split(/\s+/).filter(word => word);
+  return words.some(word => /\d/.test(word) && /^[\d.,\-\/]+$/.test(word)) ? '' : words.join(' ');
+}
+
+function toSearchQuery(text) {
+  // Match every word as a prefix, quoted so FTS5 operators are taken literally
+  return text.trim().split(/\s+/).map(word => `"${word.replace(/"/g, '""')}"*`).join(' ');
 }
 
 function applyCategoryFilter(category) {
@@ -580,24 +603,44 @@ async function getTransactions() {
   const showAll = document.getElementById('showAllTransactions').checked;
   const monthHeader = document.getElementById('monthHeader');
   const monthHeaderAll = document.getElementById('monthHeaderAll');
+  const requestId = ++transactionsRequestId;
 
   if (showAll) {
     monthHeader.style.display = 'none';
     monthHeaderAll.style.display = 'flex';
 
-    // Fetch all transactions
-    const response = await fetch(`${API_URL}/transactions`, {
-      method: 'GET',
-      credentials: 'include',
-    });
+    // Fetch all transactions (or the search results) page by page, rendering the first page right away
+    const search = toServerSearch(document.getElementById('searchInput').value);
+    loadedSearch = search;
+    gridApi.setGridOption('rowData', [])
+    let cursor = null;
+    do {
+      const params = new URLSearchParams({ limit: TRANSACTIONS_PAGE_SIZE });
+      if (search) params.set('q', toSearchQuery(search));
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_URL}/transactions${search ? '/search' : ''}?${params}`, {
+        method: 'GET',
+        credentials: 'include',
+      });
 
-    if (response.status === 401) {
-      window.location.href = '/login';
-      return;
-    }
+      if (response.status === 401) {
+        window.location.href = '/login';
+        return;
+      }
 
-    const data = await response.json()
-    gridApi.setGridOption('rowData', data)
+      const data = await response.json()
+
+      // Stop if another view was requested meanwhile
+      if (requestId !== transactionsRequestId) return;
+      if (!response.ok) {
+        loadedSearch = null;
+        bootstrap.showToast({body: [400, 404].includes(response.status) ? data.detail : "An error occurred.", delay: 3000, position: "top-0 start-50 translate-middle-x", toastClass: "text-bg-danger"})
+        return;
+      }
+      gridApi.applyTransaction({ add: data })
+      updateFooter(gridApi);
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
   }
   else {
     monthHeader.style.display = 'flex';
@@ -617,6 +660,7 @@ async function getTransactions() {
     }
 
     const data = await response.json()
+    if (requestId !== transactionsRequestId) return;
     gridApi.setGridOption('rowData', data)
   }
   updateFooter(gridApi);